@@ -0,0 +1,67 @@
+from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .models import RequestProfile
+
+
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'created', 'method', 'path', 'status_code', 'duration',
+        'query_count', 'user'
+    )
+    list_filter = ('method', 'status_code')
+    search_fields = ('path', 'user__username')
+    fields = (
+        'created', 'user', 'method', 'path', 'status_code', 'duration',
+        'query_count', 'download', 'summary_text', 'sql_text'
+    )
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/pstats/',
+                self.admin_site.admin_view(self.download_view),
+                name='api_requestprofile_pstats'
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        profile = get_object_or_404(RequestProfile, pk=pk)
+        if not self.has_view_permission(request, profile):
+            raise PermissionDenied
+        response = HttpResponse(
+            bytes(profile.stats), content_type='application/octet-stream'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename=profile-{pk}.prof'
+        )
+        return response
+
+    def download(self, obj):
+        return format_html(
+            '<a href="{}">profile-{}.prof</a>',
+            reverse('admin:api_requestprofile_pstats', args=[obj.pk]), obj.pk
+        )
+    download.short_description = 'Дамп pstats'
+
+    def summary_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.summary)
+    summary_text.short_description = 'Сводка cProfile'
+
+    def sql_text(self, obj):
+        return format_html('<pre>{}</pre>', obj.sql)
+    sql_text.short_description = 'SQL-запросы'
+
+
+admin.site.register(RequestProfile, RequestProfileAdmin)
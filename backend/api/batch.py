@@ -0,0 +1,132 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from recipes.cart_totals import change_cart_totals
+from recipes.counters import count_by
+from recipes.models import Recipe
+from users.models import CustomUser
+
+from .membership import KINDS, bump_membership
+from .shopping_cart import bump_cart_version
+
+CREATED = 'created'
+EXISTS = 'exists'
+DELETED = 'deleted'
+NOT_FOUND = 'not_found'
+INVALID = 'invalid'
+
+# Вид связи -> модель объекта и счётчик на ней.
+TARGETS = {
+    'favorites': (Recipe, 'favorites_count'),
+    'shopping_cart': (Recipe, 'in_carts_count'),
+    'follows': (CustomUser, 'followers_count'),
+}
+
+# Как и для одиночных связей, RETURNING возвращает только строки,
+# вставленные или удалённые этим запросом: параллельный запрос с теми же
+# id не даст посчитать связь дважды.
+INSERT = (
+    'INSERT INTO {table} (user_id, {field}{columns}) '
+    'SELECT %s, id{values} FROM {target} WHERE id IN ({ids}){exclude} '
+    'ON CONFLICT (user_id, {field}) DO NOTHING RETURNING {field}'
+)
+DELETE = (
+    'DELETE FROM {table} WHERE user_id = %s AND {field} IN ({ids}) '
+    'RETURNING {field}'
+)
+
+
+def execute(sql, kind, ids, params, **parts):
+    """
+    Выполняет INSERT или DELETE для связей вида kind с объектами ids,
+    возвращает множество затронутых id.
+    """
+    model, field = KINDS[kind]
+    target, _ = TARGETS[kind]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(
+            table=quote(model._meta.db_table),
+            target=quote(target._meta.db_table),
+            field=quote(field),
+            ids=', '.join(['%s'] * len(ids)),
+            **parts
+        ), params)
+        return {row[0] for row in cursor.fetchall()}
+
+
+@transaction.atomic(savepoint=False)
+def add_many(user, kind, ids):
+    """
+    Добавляет объекты ids в избранное, корзину или подписки одним
+    INSERT и возвращает статус для каждого id.
+    """
+    model, _ = KINDS[kind]
+    target, _ = TARGETS[kind]
+    parts = {'columns': '', 'values': '', 'exclude': ''}
+    if kind == 'follows':
+        parts['exclude'] = ' AND id <> %s'
+        params = [user.id, *ids, user.id]
+    else:
+        parts['columns'], parts['values'] = ', when_added', ', %s'
+        when_added = model._meta.get_field(
+            'when_added').get_db_prep_value(timezone.now(), connection)
+        params = [user.id, when_added, *ids]
+    created = execute(INSERT, kind, ids, params, **parts)
+    rest = [obj_id for obj_id in ids if obj_id not in created]
+    found = set(target.objects.filter(pk__in=rest).values_list(
+        'pk', flat=True)) if rest else set()
+    results = {}
+    for obj_id in ids:
+        if obj_id in created:
+            results[obj_id] = CREATED
+        elif obj_id not in found:
+            results[obj_id] = NOT_FOUND
+        elif kind == 'follows' and obj_id == user.id:
+            results[obj_id] = INVALID
+        else:
+            results[obj_id] = EXISTS
+    if created:
+        links_changed(user, kind, created, True)
+    return results
+
+
+@transaction.atomic(savepoint=False)
+def remove_many(user, kind, ids):
+    """
+    Убирает объекты ids из избранного, корзины или подписок одним
+    DELETE и возвращает статус для каждого id.
+    """
+    deleted = execute(DELETE, kind, ids, [user.id, *ids])
+    if deleted:
+        links_changed(user, kind, deleted, False)
+    return {
+        obj_id: DELETED if obj_id in deleted else NOT_FOUND
+        for obj_id in ids
+    }
+
+
+def links_changed(user, kind, obj_ids, added):
+    """
+    То, что для одиночных связей делают сигналы: счётчики, кеш связей,
+    итоги и версия корзины.
+    """
+    model, field = KINDS[kind]
+    target, counter = TARGETS[kind]
+    # Пересчёт, а не +-1: параллельный запрос мог поменять те же строки.
+    target.objects.filter(pk__in=obj_ids).update(
+        **{counter: count_by(model.objects, field)}
+    )
+    if kind == 'shopping_cart':
+        change_cart_totals(user.id, obj_ids, 1 if added else -1)
+    transaction.on_commit(lambda: refresh_caches(user.id, kind))
+
+
+def refresh_caches(user_id, kind):
+    """
+    Сбрасывает кеш связей. Вызывается только после фиксации транзакции:
+    иначе параллельное чтение закеширует старые строки под новой версией
+    корзины, а откат оставит в кеше несуществующие связи.
+    """
+    bump_membership(user_id, kind)
+    if kind == 'shopping_cart':
+        bump_cart_version(user_id)
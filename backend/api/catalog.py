@@ -0,0 +1,27 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils import timezone
+
+VERSION_KEY = 'catalog_version:{catalog}'
+BODY_KEY = 'catalog_body:{catalog}:{version}:{accept}'
+
+
+def get_catalog_version(catalog):
+    """
+    Версия справочника и время её смены: (version, last_modified).
+    """
+    key = VERSION_KEY.format(catalog=catalog)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, (uuid4().hex, timezone.now()), None)
+        return cache.get(key)
+    return value
+
+
+def bump_catalog_version(catalog):
+    cache.set(
+        VERSION_KEY.format(catalog=catalog),
+        (uuid4().hex, timezone.now()),
+        None
+    )
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from PIL import Image
+from rest_framework import serializers
+
+
+def validate_image_file(file):
+    """
+    Проверка размера файла и фото по заголовку, до полного декодирования.
+    """
+    if file.size > settings.RECIPE_IMAGE_MAX_SIZE:
+        raise serializers.ValidationError('Файл изображения слишком большой')
+    file.seek(0)
+    try:
+        width, height = Image.open(file).size
+    except (OSError, Image.DecompressionBombError):
+        raise serializers.ValidationError('Некорректное изображение')
+    finally:
+        file.seek(0)
+    if (max(width, height) > settings.RECIPE_IMAGE_MAX_SIDE
+            or width * height > settings.RECIPE_IMAGE_MAX_PIXELS):
+        raise serializers.ValidationError(
+            'Слишком большое разрешение изображения'
+        )
+
+
+class RecipeImageField(Base64ImageField):
+    """
+    Фото рецепта строкой base64 в json или файлом в multipart/form-data.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            file = serializers.ImageField.to_internal_value(self, data)
+        else:
+            if (isinstance(data, str)
+                    and len(data) * 3 // 4 > settings.RECIPE_IMAGE_MAX_SIZE):
+                raise serializers.ValidationError(
+                    'Файл изображения слишком большой'
+                )
+            file = super().to_internal_value(data)
+        if file is not None:
+            validate_image_file(file)
+        return file
@@ -1,13 +1,35 @@
+from django.core.cache import cache
+from django.db.models import F
 from django_filters import rest_framework as filter
 from recipes.models import Recipe, Tag
+from recipes.search import search_recipes
+from recipes.tag_masks import matching_masks, tags_mask
+
+from .catalog import get_catalog_version
+
+TAG_BITS_KEY = 'tag_bits:{version}'
+# При большем числе тэгов список подходящих масок слишком длинный,
+# и фильтр переходит на побитовое И.
+MAX_MASKS_TAGS = 8
+
+
+def get_tag_bits():
+    version, _ = get_catalog_version('tags')
+    return cache.get_or_set(
+        TAG_BITS_KEY.format(version=version),
+        lambda: list(Tag.objects.exclude(bit=None).values_list(
+            'bit', flat=True))
+    )
 
 
 class RecipeFilter(filter.FilterSet):
     tags = filter.ModelMultipleChoiceFilter(
         field_name='tags__slug',
         queryset=Tag.objects.all(),
-        to_field_name='slug'
+        to_field_name='slug',
+        method='filter_tags'
     )
+    search = filter.CharFilter(method='filter_search')
     is_favorited = filter.BooleanFilter(method='get_favorite')
     is_in_shopping_cart = filter.BooleanFilter(
         method='get_is_in_shopping_cart'
@@ -15,7 +37,37 @@ class RecipeFilter(filter.FilterSet):
 
     class Meta:
         model = Recipe
-        fields = ('is_favorited', 'is_in_shopping_cart', 'author', 'tags')
+        fields = ('is_favorited', 'is_in_shopping_cart', 'author', 'tags',
+                  'search')
+
+    def filter_tags(self, queryset, name, value):
+        """
+        Рецепты хотя бы с одним из выбранных тэгов - по маске тэгов,
+        без join с тэгами и без дублей.
+        """
+        if not value:
+            return queryset
+        if any(tag.bit is None for tag in value):
+            # Тэг ещё без бита и не попал в маски рецептов.
+            return queryset.filter(tags__in=value).distinct()
+        selected = tags_mask(tag.bit for tag in value)
+        bits = get_tag_bits()
+        if len(bits) <= MAX_MASKS_TAGS:
+            return queryset.filter(
+                tags_mask__in=matching_masks(selected, bits)
+            )
+        return queryset.annotate(
+            selected_tags=F('tags_mask').bitand(selected)
+        ).filter(selected_tags__gt=0)
+
+    def filter_search(self, queryset, name, value):
+        """
+        Поиск по названию, описанию и ингредиентам, сначала самые
+        релевантные. При курсорной пагинации порядок остаётся по дате.
+        """
+        if not value.strip():
+            return queryset
+        return search_recipes(queryset, value)
 
     def get_favorite(self, queryset, name, value):
         user = self.request.user
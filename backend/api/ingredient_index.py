@@ -0,0 +1,67 @@
+import threading
+from bisect import bisect_left
+
+from recipes.models import Ingredient
+
+from .catalog import get_catalog_version
+
+
+def normalize(value):
+    return value.strip().lower().replace('ё', 'е')
+
+
+class IngredientIndex:
+    """
+    Индекс ингредиентов в памяти процесса для автодополнения.
+
+    Хранит отсортированный по нормализованному названию список и
+    перечитывает его из базы, только когда меняется версия в кеше.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._keys = []
+        self._items = []
+
+    def _load(self):
+        version, _ = get_catalog_version('ingredients')
+        if version == self._version:
+            return self._keys, self._items
+        with self._lock:
+            if version != self._version:
+                items = sorted(
+                    Ingredient.objects.values(
+                        'id', 'name', 'measurement_unit'),
+                    key=lambda item: (normalize(item['name']), item['id'])
+                )
+                self._keys = [normalize(item['name']) for item in items]
+                self._items = items
+                self._version = version
+            return self._keys, self._items
+
+    def search(self, query='', limit=None):
+        """
+        Сначала ингредиенты, название которых начинается с query,
+        затем те, где query встречается внутри названия.
+        """
+        keys, items = self._load()
+        query = normalize(query)
+        if not query:
+            return items[:limit]
+        start = bisect_left(keys, query)
+        end = start
+        while end < len(keys) and keys[end].startswith(query):
+            end += 1
+        result = items[start:end]
+        if limit is not None and len(result) >= limit:
+            return result[:limit]
+        for key, item in zip(keys, items):
+            if query in key and not key.startswith(query):
+                result.append(item)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,68 @@
+from django.db import connection, transaction
+from django.utils import timezone
+from recipes.cart_totals import change_cart_totals
+from recipes.counters import change_counter
+from recipes.models import Recipe
+
+from .batch import TARGETS, refresh_caches
+from .membership import KINDS
+
+# Вставка сразу проверяет, что рецепт существует, и ничего не делает,
+# если связь уже есть: RETURNING вернёт строку только при вставке.
+# RETURNING есть в PostgreSQL и в SQLite начиная с 3.35.
+INSERT = (
+    'INSERT INTO {table} (user_id, recipe_id, when_added) '
+    'SELECT %s, id, %s FROM {recipes} WHERE id = %s '
+    'ON CONFLICT (user_id, recipe_id) DO NOTHING RETURNING id'
+)
+DELETE = (
+    'DELETE FROM {table} WHERE user_id = %s AND recipe_id = %s '
+    'RETURNING id'
+)
+
+
+def execute(sql, model, params):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(
+            table=quote(model._meta.db_table),
+            recipes=quote(Recipe._meta.db_table)
+        ), params)
+        return cursor.fetchone() is not None
+
+
+@transaction.atomic(savepoint=False)
+def add_recipe(user, kind, recipe_id):
+    """
+    Добавляет рецепт в избранное или корзину одним INSERT.
+    Возвращает True, если связь создана этим вызовом.
+    """
+    model, _ = KINDS[kind]
+    when_added = model._meta.get_field('when_added').get_db_prep_value(
+        timezone.now(), connection
+    )
+    created = execute(INSERT, model, (user.id, when_added, recipe_id))
+    if created:
+        recipe_link_changed(user, kind, recipe_id, 1)
+    return created
+
+
+@transaction.atomic(savepoint=False)
+def remove_recipe(user, kind, recipe_id):
+    """
+    Убирает рецепт из избранного или корзины одним DELETE.
+    Возвращает True, если связь была.
+    """
+    model, _ = KINDS[kind]
+    deleted = execute(DELETE, model, (user.id, recipe_id))
+    if deleted:
+        recipe_link_changed(user, kind, recipe_id, -1)
+    return deleted
+
+
+def recipe_link_changed(user, kind, recipe_id, delta):
+    # Сырой SQL обходит сигналы, их работа делается здесь.
+    change_counter(Recipe, recipe_id, TARGETS[kind][1], delta)
+    if kind == 'shopping_cart':
+        change_cart_totals(user.id, [recipe_id], delta)
+    transaction.on_commit(lambda: refresh_caches(user.id, kind))
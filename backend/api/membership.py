@@ -0,0 +1,61 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from recipes.models import Favorite, ShoppingList
+from users.models import Follow
+
+MEMBERSHIP_VERSION_KEY = 'membership_version:{kind}:{user_id}'
+MEMBERSHIP_KEY = 'membership:{kind}:{user_id}:{version}'
+
+# Вид связи -> модель и поле с id объекта.
+KINDS = {
+    'favorites': (Favorite, 'recipe_id'),
+    'shopping_cart': (ShoppingList, 'recipe_id'),
+    'follows': (Follow, 'author_id'),
+}
+
+
+def get_membership(user_id, kind):
+    """
+    Множество id рецептов в избранном/корзине или авторов в подписках
+    пользователя. При промахе кеша загружается одним запросом.
+    """
+    version = cache.get_or_set(
+        MEMBERSHIP_VERSION_KEY.format(kind=kind, user_id=user_id),
+        uuid4().hex, None
+    )
+    key = MEMBERSHIP_KEY.format(kind=kind, user_id=user_id, version=version)
+    ids = cache.get(key)
+    if ids is None:
+        model, field = KINDS[kind]
+        ids = set(model.objects.filter(
+            user_id=user_id).values_list(field, flat=True))
+        cache.set(key, ids, settings.MEMBERSHIP_CACHE_TIMEOUT)
+    return ids
+
+
+def bump_membership(user_id, kind):
+    """
+    Новая версия множества после записи в базу. Множество, прочитанное
+    параллельным запросом до записи, ляжет под старую версию и больше
+    не будет прочитано.
+    """
+    cache.set(
+        MEMBERSHIP_VERSION_KEY.format(kind=kind, user_id=user_id),
+        uuid4().hex, None
+    )
+
+
+def is_member(context, kind, obj_id):
+    """
+    Проверка для сериализаторов: множество читается из кеша один раз
+    на запрос и запоминается в контексте сериализатора.
+    """
+    request = context.get('request')
+    if request is None or request.user.is_anonymous:
+        return False
+    context_key = f'membership:{kind}'
+    if context_key not in context:
+        context[context_key] = get_membership(request.user.id, kind)
+    return obj_id in context[context_key]
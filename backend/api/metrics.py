@@ -0,0 +1,233 @@
+import atexit
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Имя -> (тип, описание, границы бакетов гистограммы).
+METRICS = {
+    'foodgram_http_requests_total': (
+        'counter', 'Количество запросов.', None
+    ),
+    'foodgram_http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    ),
+    'foodgram_http_request_db_queries': (
+        'histogram', 'Количество SQL-запросов на запрос.',
+        (0, 1, 2, 3, 5, 10, 20, 50, 100)
+    ),
+    'foodgram_http_response_size_bytes': (
+        'histogram', 'Размер тела ответа.',
+        (100, 1000, 10000, 100000, 1000000, 10000000)
+    ),
+    'foodgram_cache_requests_total': (
+        'counter', 'Обращения к кешу по префиксу ключа.', None
+    ),
+}
+SUFFIXES = ('_bucket', '_sum', '_count')
+BOUND = re.compile(r',?le="([^"]+)"$')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS samples (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+)
+'''
+UPSERT = '''
+INSERT INTO samples (name, labels, value) VALUES (?, ?, ?)
+ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value
+'''
+
+
+def format_labels(labels):
+    return ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace(
+            '"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+
+
+def format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def format_bound(bound):
+    return '+Inf' if bound == math.inf else repr(float(bound))
+
+
+class MetricsStore:
+    """
+    Счётчики и гистограммы, общие для всех воркеров gunicorn.
+
+    Каждый процесс копит приращения в памяти и раз в
+    METRICS_FLUSH_INTERVAL секунд прибавляет их к значениям в общем
+    sqlite-файле METRICS_STORE. При выгрузке метрик процесс сначала
+    сбрасывает свои приращения, так что отставать могут только
+    остальные воркеры.
+    """
+
+    def __init__(self, path, flush_interval):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.pending = defaultdict(float)
+        self.last_flush = time.monotonic()
+        atexit.register(self.flush)
+
+    def connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(SCHEMA)
+        return connection
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock:
+            if self.pid != os.getpid():
+                # Приращения родителя после fork достались бы дважды.
+                self.pid = os.getpid()
+                self.pending.clear()
+            self.pending[name, format_labels(labels)] += value
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        for bound in (*buckets, math.inf):
+            if value <= bound:
+                self.inc(
+                    f'{name}_bucket', (*labels, ('le', format_bound(bound)))
+                )
+        self.inc(f'{name}_sum', labels, value)
+        self.inc(f'{name}_count', labels)
+
+    def flush(self):
+        with self.lock:
+            pending = list(self.pending.items())
+            self.pending.clear()
+            self.last_flush = time.monotonic()
+        if not pending:
+            return
+        connection = self.connect()
+        try:
+            with connection:
+                connection.executemany(UPSERT, [
+                    (name, labels, value)
+                    for (name, labels), value in pending
+                ])
+        finally:
+            connection.close()
+
+    def samples(self):
+        self.flush()
+        connection = self.connect()
+        try:
+            return connection.execute(
+                'SELECT name, labels, value FROM samples'
+            ).fetchall()
+        finally:
+            connection.close()
+
+    def export(self):
+        """
+        Все метрики в текстовом формате Prometheus.
+        """
+        families = defaultdict(list)
+        for name, labels, value in self.samples():
+            family = name
+            for suffix in SUFFIXES:
+                if name.endswith(suffix) and name[:-len(suffix)] in METRICS:
+                    family = name[:-len(suffix)]
+            families[family].append((name, labels, value))
+        lines = []
+        for family in sorted(families):
+            if family in METRICS:
+                kind, help_text = METRICS[family][:2]
+                lines.append(f'# HELP {family} {help_text}')
+                lines.append(f'# TYPE {family} {kind}')
+            for name, labels, value in sorted(
+                    families[family], key=sample_order):
+                if labels:
+                    name = f'{name}{{{labels}}}'
+                lines.append(f'{name} {format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def sample_order(sample):
+    """
+    Бакеты гистограммы идут по возрастанию le, за ними _sum и _count.
+    """
+    name, labels, _ = sample
+    bound = 0.0
+    match = BOUND.search(labels)
+    if match:
+        labels = labels[:match.start()]
+        bound = float(match.group(1))
+    rank = next(
+        (rank for rank, suffix in enumerate(SUFFIXES)
+         if name.endswith(suffix)), 0
+    )
+    return labels, rank, bound
+
+
+@lru_cache(maxsize=None)
+def get_store():
+    return MetricsStore(
+        settings.METRICS_STORE, settings.METRICS_FLUSH_INTERVAL
+    )
+
+
+def metered_get(get):
+    missing = object()
+
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, missing, version)
+        hit = value is not missing
+        record_cache_access(key, hit)
+        return value if hit else default
+    wrapper.metered = True
+    return wrapper
+
+
+def metered_get_many(get_many):
+    def wrapper(self, keys, version=None):
+        keys = list(keys)
+        values = get_many(self, keys, version)
+        for key in keys:
+            record_cache_access(key, key in values)
+        return values
+    wrapper.metered = True
+    return wrapper
+
+
+def record_cache_access(key, hit):
+    if not settings.METRICS_ENABLED:
+        return
+    get_store().inc('foodgram_cache_requests_total', (
+        ('prefix', str(key).split(':', 1)[0]),
+        ('result', 'hit' if hit else 'miss'),
+    ))
+
+
+def install_cache_metrics():
+    """
+    Подсчёт попаданий и промахов для всех настроенных кешей.
+    """
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if getattr(backend.get, 'metered', False):
+            continue
+        backend.get = metered_get(backend.get)
+        # Унаследованный get_many сам вызывает get.
+        if 'get_many' in vars(backend):
+            backend.get_many = metered_get_many(backend.get_many)
@@ -0,0 +1,149 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from .metrics import get_store, install_cache_metrics
+from .profiling import get_profile_mode, get_staff_user, profile_request
+from .timing import collect_stats, install_serializer_timing
+
+logger = logging.getLogger(__name__)
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 1)
+
+
+class ServerTimingMiddleware:
+    """
+    Добавляет к ответу заголовок Server-Timing с числом и временем
+    SQL-запросов, временем сериализации и общим временем запроса.
+    Запросы дольше SLOW_REQUEST_THRESHOLD мс пишутся в лог вместе
+    с самыми медленными и повторяющимися запросами к базе.
+
+    При выключенном SERVER_TIMING_ENABLED не подключается совсем.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        install_serializer_timing()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_stats() as stats:
+            response = self.get_response(request)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={milliseconds(stats.db_time)};'
+            f'desc="{len(stats.queries)} queries"',
+            f'serialize;dur={milliseconds(stats.serialize_time)}',
+            f'total;dur={milliseconds(stats.total_time)}',
+        ))
+        if stats.total_time * 1000 >= settings.SLOW_REQUEST_THRESHOLD:
+            self.log_slow_request(request, response, stats)
+        return response
+
+    def log_slow_request(self, request, response, stats):
+        lines = [
+            f'{request.method} {request.get_full_path()} '
+            f'{response.status_code}: {milliseconds(stats.total_time)} мс, '
+            f'SQL: {len(stats.queries)} за '
+            f'{milliseconds(stats.db_time)} мс'
+        ]
+        lines.extend(
+            f'  {milliseconds(duration)} мс: {sql}'
+            for sql, duration in stats.slowest()
+        )
+        lines.extend(
+            f'  x{count}: {sql}' for sql, count in stats.duplicated()[:5]
+        )
+        logger.warning('\n'.join(lines))
+
+
+class MetricsMiddleware:
+    """
+    Считает запросы, их длительность, число SQL-запросов и размер
+    ответа по каждому view для /api/metrics/.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        install_cache_metrics()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collect_stats() as stats:
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        store = get_store()
+        store.inc('foodgram_http_requests_total', (
+            ('view', view), ('method', request.method),
+            ('status', response.status_code),
+        ))
+        labels = (('view', view), ('method', request.method))
+        store.observe(
+            'foodgram_http_request_duration_seconds', labels, duration
+        )
+        store.observe(
+            'foodgram_http_request_db_queries', labels, len(stats.queries)
+        )
+        if response.streaming:
+            response.streaming_content = self.measure(
+                response.streaming_content, labels
+            )
+        else:
+            store.observe(
+                'foodgram_http_response_size_bytes', labels,
+                len(response.content)
+            )
+        return response
+
+    def measure(self, content, labels):
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            get_store().observe(
+                'foodgram_http_response_size_bytes', labels, size
+            )
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование запроса через cProfile по ?profile= или заголовку
+    X-Profile. Доступно только staff, остальным параметр ничего
+    не даёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = get_profile_mode(request)
+        user = get_staff_user(request) if mode else None
+        if user is None:
+            return self.get_response(request)
+        profile = profile_request(self.get_response, request)
+        if mode == 'text':
+            return HttpResponse(
+                profile.report(), content_type='text/plain; charset=utf-8'
+            )
+        if mode == 'pstats':
+            response = HttpResponse(
+                profile.dump, content_type='application/octet-stream'
+            )
+            response['Content-Disposition'] = (
+                'attachment; filename=request.prof'
+            )
+            return response
+        response = profile.response
+        response['X-Profile-Id'] = profile.save(user).pk
+        return response
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .catalog import BODY_KEY, get_catalog_version
+
+
+class CatalogCacheMixin:
+    """
+    Условные GET-запросы для справочников.
+
+    ETag и Last-Modified берутся из версии справочника в кеше, поэтому
+    ответ 304 отдаётся без обращения к базе и без сериализации. Полный
+    список без параметров кешируется уже отрендеренным.
+    """
+    catalog = None
+    authentication_classes = ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        version, last_modified = get_catalog_version(self.catalog)
+        etag = quote_etag(f'{self.catalog}-{version}')
+        last_modified = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.cached_dispatch(
+                version, request, *args, **kwargs
+            )
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def cached_dispatch(self, version, request, *args, **kwargs):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        if lookup in kwargs or request.GET:
+            return super().dispatch(request, *args, **kwargs)
+        key = BODY_KEY.format(
+            catalog=self.catalog, version=version,
+            accept=request.META.get('HTTP_ACCEPT', '')
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.render()
+            cache.set(key, (response.content, response['Content-Type']))
+        return response
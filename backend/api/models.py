@@ -0,0 +1,26 @@
+from django.db import models
+from users.models import CustomUser
+
+
+class RequestProfile(models.Model):
+    created = models.DateTimeField(
+        auto_now_add=True, db_index=True, verbose_name='Дата')
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.SET_NULL, null=True,
+        related_name='request_profiles', verbose_name='Пользователь')
+    method = models.CharField(max_length=10, verbose_name='Метод')
+    path = models.TextField(verbose_name='Адрес')
+    status_code = models.PositiveSmallIntegerField(verbose_name='Статус')
+    duration = models.FloatField(verbose_name='Время, мс')
+    query_count = models.PositiveIntegerField(verbose_name='SQL-запросов')
+    summary = models.TextField(verbose_name='Сводка cProfile')
+    sql = models.TextField(verbose_name='SQL-запросы')
+    stats = models.BinaryField(verbose_name='Дамп pstats')
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+
+    def __str__(self):
+        return f'{self.method} {self.path}'
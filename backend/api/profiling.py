@@ -0,0 +1,113 @@
+import cProfile
+import marshal
+import pstats
+import time
+from io import StringIO
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from .models import RequestProfile
+from .timing import collect_stats
+
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+MODES = ('store', 'text', 'pstats')
+
+
+def get_profile_mode(request):
+    """
+    Режим профилирования из ?profile= или заголовка X-Profile:
+    store - сохранить профиль, text - вернуть сводку вместо ответа,
+    pstats - вернуть дамп для snakeviz и pstats.
+    """
+    mode = request.GET.get(PROFILE_PARAM, request.META.get(PROFILE_HEADER))
+    if mode is None:
+        return None
+    if mode in MODES:
+        return mode
+    return 'store'
+
+
+def get_staff_user(request):
+    """
+    Staff-пользователь из сессии или токена, иначе None.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = TokenAuthentication().authenticate(Request(request))
+        except AuthenticationFailed:
+            return None
+        user = result[0] if result else None
+    if user is not None and user.is_staff:
+        return user
+    return None
+
+
+def format_sql(stats):
+    # Только текст запросов: в параметрах бывают хеши паролей и токены.
+    return '\n\n'.join(
+        f'-- {duration * 1000:.2f} мс\n{sql}'
+        for sql, duration in stats.queries
+    )
+
+
+class Profile:
+    """
+    Результат профилирования одного запроса.
+    """
+
+    def __init__(self, request, response, profiler, stats, duration):
+        self.request = request
+        self.response = response
+        self.duration = duration
+        self.stats = stats
+        profiler.create_stats()
+        self.dump = marshal.dumps(profiler.stats)
+        stream = StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(
+            'cumulative').print_stats(settings.PROFILE_TOP_N)
+        self.summary = stream.getvalue()
+
+    def report(self):
+        return (
+            f'{self.request.method} {self.request.get_full_path()} '
+            f'{self.response.status_code}: {self.duration:.1f} мс, '
+            f'SQL: {len(self.stats.queries)}\n\n{self.summary}\n'
+            f'{format_sql(self.stats)}\n'
+        )
+
+    def save(self, user):
+        stale = RequestProfile.objects.values_list(
+            'pk', flat=True)[settings.PROFILE_KEEP - 1:]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+        return RequestProfile.objects.create(
+            user=user, method=self.request.method,
+            path=self.request.get_full_path(),
+            status_code=self.response.status_code,
+            duration=self.duration, query_count=len(self.stats.queries),
+            summary=self.summary, sql=format_sql(self.stats),
+            stats=self.dump
+        )
+
+
+def profile_request(get_response, request):
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    with collect_stats() as stats:
+        profiler.enable()
+        try:
+            response = get_response(request)
+            if response.streaming:
+                # Файл отдаётся по частям уже после view, его сборку
+                # тоже нужно увидеть в профиле.
+                response.streaming_content = [
+                    b''.join(response.streaming_content)
+                ]
+        finally:
+            profiler.disable()
+    duration = (time.perf_counter() - start) * 1000
+    return Profile(request, response, profiler, stats, duration)
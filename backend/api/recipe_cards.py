@@ -0,0 +1,94 @@
+from collections import defaultdict
+
+from recipes.images import build_srcset
+from recipes.models import IngredientInRecipe, Recipe
+from recipes.storage import recipe_image_storage
+
+from .membership import is_member
+from .timing import serialization
+
+RECIPE_FIELDS = (
+    'id', 'name', 'image', 'image_variants_for', 'text', 'cooking_time',
+    'pub_date', 'author_id', 'author__email', 'author__username',
+    'author__first_name', 'author__last_name',
+)
+
+
+def recipe_rows(queryset):
+    """
+    Рецепты вместе с авторами одним запросом, без создания моделей.
+    """
+    return queryset.values(*RECIPE_FIELDS)
+
+
+def get_tags(recipe_ids):
+    tags = defaultdict(list)
+    rows = Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids).order_by('pk').values_list(
+        'recipe_id', 'tag_id', 'tag__name', 'tag__color', 'tag__slug')
+    for recipe_id, tag_id, name, color, slug in rows:
+        tags[recipe_id].append(
+            {'id': tag_id, 'name': name, 'color': color, 'slug': slug}
+        )
+    return tags
+
+
+def get_ingredients(recipe_ids):
+    ingredients = defaultdict(list)
+    rows = IngredientInRecipe.objects.filter(
+        recipe_id__in=recipe_ids).order_by('pk').values_list(
+        'recipe_id', 'ingredient_id', 'ingredient__name',
+        'ingredient__measurement_unit', 'amount')
+    for recipe_id, ingredient_id, name, unit, amount in rows:
+        ingredients[recipe_id].append({
+            'id': ingredient_id, 'name': name, 'measurement_unit': unit,
+            'amount': amount,
+        })
+    return ingredients
+
+
+def render_recipes(rows, context):
+    """
+    Карточки рецептов в том же виде, что и ListRecipeSerializer,
+    из строк recipe_rows: ещё по запросу на теги и ингредиенты.
+    """
+    rows = list(rows)
+    recipe_ids = [row['id'] for row in rows]
+    tags = get_tags(recipe_ids)
+    ingredients = get_ingredients(recipe_ids)
+    with serialization():
+        return [render_recipe(row, tags, ingredients, context)
+                for row in rows]
+
+
+def render_recipe(row, tags, ingredients, context):
+    request = context.get('request')
+    recipe_id = row['id']
+    image = row['image']
+    image_url = None
+    srcset = None
+    if image:
+        image_url = recipe_image_storage.url(image)
+        if request is not None:
+            image_url = request.build_absolute_uri(image_url)
+        srcset = build_srcset(image, row['image_variants_for'], request)
+    return {
+        'id': recipe_id,
+        'tags': tags[recipe_id],
+        'author': {
+            'email': row['author__email'],
+            'id': row['author_id'],
+            'username': row['author__username'],
+            'first_name': row['author__first_name'],
+            'last_name': row['author__last_name'],
+            'is_subscribed': is_member(context, 'follows', row['author_id']),
+        },
+        'ingredients': ingredients[recipe_id],
+        'is_favorited': is_member(context, 'favorites', recipe_id),
+        'is_in_shopping_cart': is_member(context, 'shopping_cart', recipe_id),
+        'name': row['name'],
+        'image': image_url,
+        'image_srcset': srcset,
+        'text': row['text'],
+        'cooking_time': row['cooking_time'],
+    }
@@ -0,0 +1,121 @@
+import csv
+import os
+from datetime import date
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+from rest_framework.renderers import BaseRenderer
+
+CHUNK_SIZE = 64 * 1024
+
+
+class ShoppingCartRenderer(BaseRenderer):
+    """
+    Базовый рендерер списка покупок.
+
+    stream() отдаёт файл кусками для StreamingHttpResponse,
+    render() нужен только для ответов с ошибками.
+    """
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode(self.charset)
+
+    def stream(self, rows):
+        raise NotImplementedError
+
+
+class ShoppingCartTextRenderer(ShoppingCartRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def stream(self, rows):
+        for name, measurement_unit, total in rows:
+            yield f'{name} - {total} {measurement_unit}\n'.encode(
+                self.charset)
+        yield f'FoodGram, {date.today().year}'.encode(self.charset)
+
+
+class ShoppingCartCSVRenderer(ShoppingCartRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows):
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(('name', 'measurement_unit', 'amount'))
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode(self.charset)
+
+
+class ShoppingCartPDFRenderer(ShoppingCartRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    font_name = 'ShoppingCartFont'
+    font_size = 12
+    line_height = 7 * mm
+    margin = 20 * mm
+
+    def get_font(self):
+        # Стандартные шрифты PDF не содержат кириллицы.
+        if self.font_name in pdfmetrics.getRegisteredFontNames():
+            return self.font_name
+        font_path = settings.SHOPPING_CART_PDF_FONT
+        if not os.path.exists(font_path):
+            return 'Helvetica'
+        pdfmetrics.registerFont(TTFont(self.font_name, font_path))
+        return self.font_name
+
+    def stream(self, rows):
+        # reportlab собирает документ целиком, поэтому стримится
+        # уже готовый файл.
+        buffer = BytesIO()
+        font = self.get_font()
+        pdf = canvas.Canvas(buffer, pagesize=A4)
+        width, height = A4
+        top = height - self.margin
+        pdf.setFont(font, self.font_size)
+        pdf.drawString(self.margin, top, 'Список покупок')
+        y = top - 2 * self.line_height
+        for name, measurement_unit, total in rows:
+            if y < self.margin:
+                pdf.showPage()
+                pdf.setFont(font, self.font_size)
+                y = top
+            pdf.drawString(
+                self.margin, y, f'{name} - {total} {measurement_unit}')
+            y -= self.line_height
+        pdf.drawString(
+            self.margin, self.margin / 2, f'FoodGram, {date.today().year}')
+        pdf.save()
+        buffer.seek(0)
+        yield from iter(lambda: buffer.read(CHUNK_SIZE), b'')
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Текстовый формат Prometheus для /api/metrics/.
+    """
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = '\n'.join(
+                f'# {key}: {value}' for key, value in data.items()
+            )
+        return str(data).encode(self.charset)
@@ -1,14 +1,23 @@
+import json
 import re
 
+from django.conf import settings
 from django.db import transaction
+from django.http import QueryDict
 from djoser.serializers import UserCreateSerializer
-from drf_extra_fields.fields import Base64ImageField
-from recipes.models import (CustomUser, Favorite, Ingredient,
-                            IngredientInRecipe, Recipe, ShoppingList, Tag)
+from recipes.cart_totals import apply_recipe_changes
+from recipes.images import get_srcset, schedule_variants
+from recipes.models import (CustomUser, Ingredient, IngredientInRecipe, Recipe,
+                            Tag)
+from recipes.search import update_search_index
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 from users.models import Follow
 
+from .fields import RecipeImageField
+from .membership import is_member
+from .shopping_cart import bump_recipe_carts
+
 
 class BaseUserSerializer(serializers.ModelSerializer):
     """
@@ -22,10 +31,7 @@ class BaseUserSerializer(serializers.ModelSerializer):
                   'is_subscribed')
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Follow.objects.filter(user=request.user, author=obj).exists()
+        return is_member(self.context, 'follows', obj.id)
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -43,7 +49,7 @@ class TagSerializer(serializers.ModelSerializer):
     """
     class Meta:
         model = Tag
-        fields = '__all__'
+        fields = ('id', 'name', 'color', 'slug')
 
     def validate_color(self, data):
         color = self.initial_data.get('color')
@@ -93,102 +99,55 @@ class FollowSerializer(serializers.ModelSerializer):
         return data
 
     def to_representation(self, instance):
-        request = self.context.get('request')
-        context = {'request': request}
         return ShowFollowersSerializer(
             instance.author,
-            context=context).data
+            context=self.context).data
 
 
-class FavorShopGeneralSerializer(serializers.ModelSerializer):
+class BatchSerializer(serializers.Serializer):
     """
-    Общий сериализатор для наследования избранного и списка покупок.
+    Список id для пакетного добавления и удаления.
     """
-    recipe = serializers.PrimaryKeyRelatedField(
-        queryset=Recipe.objects.all()
-    )
-    user = serializers.PrimaryKeyRelatedField(
-        queryset=CustomUser.objects.all()
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False, max_length=settings.BATCH_MAX_IDS
     )
 
-    def to_representation(self, instance):
-        request = self.context.get('request')
-        context = {'request': request}
-        return ShowRecipeSerializer(
-            instance.recipe,
-            context=context).data
-
-
-class FavoriteSerializer(FavorShopGeneralSerializer):
-    """
-    Избранное.
-    """
-    class Meta:
-        model = Favorite
-        fields = (
-            'user',
-            'recipe'
-        )
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Favorite.objects.all(),
-                fields=['user', 'recipe'],
-                message=('Рецепт уже добавлен в избранное')
-            )
-        ]
-
-
-class ShoppingListSerializer(FavorShopGeneralSerializer):
-    """
-    Список покупок.
-    """
-    class Meta:
-        model = ShoppingList
-        fields = (
-            'user',
-            'recipe'
-        )
-        validators = [
-            UniqueTogetherValidator(
-                queryset=ShoppingList.objects.all(),
-                fields=['user', 'recipe'],
-                message=('Продукты уже в корзине')
-            )
-        ]
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))
 
 
 class ListRecipeSerializer(serializers.ModelSerializer):
     """
     Отображение списка рецептов.
+
+    Ответы списка и детальной страницы собирает api.recipe_cards без
+    создания моделей, формат ответа должен совпадать с этим сериализатором.
     """
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
     tags = TagSerializer(many=True, read_only=True)
     author = BaseUserSerializer(read_only=True)
     ingredients = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
         fields = ('id', 'tags', 'author', 'ingredients',
                   'is_favorited', 'is_in_shopping_cart',
-                  'name', 'image', 'text', 'cooking_time')
+                  'name', 'image', 'image_srcset', 'text', 'cooking_time')
+
+    def get_image_srcset(self, obj):
+        return get_srcset(obj, self.context.get('request'))
 
     def get_is_favorited(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        user = request.user
-        return Favorite.objects.filter(recipe=obj, user=user).exists()
+        return is_member(self.context, 'favorites', obj.id)
 
     def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        user = request.user
-        return ShoppingList.objects.filter(recipe=obj, user=user).exists()
+        return is_member(self.context, 'shopping_cart', obj.id)
 
     def get_ingredients(self, obj):
-        qs = IngredientInRecipe.objects.filter(recipe=obj)
+        qs = obj.recipes_ingredients_list.all()
         return IngredientInRecipeSerializerToCreateRecipe(qs, many=True).data
 
 
@@ -196,9 +155,14 @@ class ShowRecipeSerializer(serializers.ModelSerializer):
     """
     Сериализатор для отображения рецепта в избраном и списке покупок.
     """
+    image_srcset = serializers.SerializerMethodField()
+
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_srcset', 'cooking_time')
+
+    def get_image_srcset(self, obj):
+        return get_srcset(obj, self.context.get('request'))
 
     def get_ingredients(self, obj):
         qs = obj.recipes_ingredients_list.all()
@@ -249,17 +213,21 @@ class ShowFollowerRecipeSerializer(serializers.ModelSerializer):
         allow_empty_file=False,
         use_url=True,
     )
+    image_srcset = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
+        fields = ('id', 'name', 'image', 'image_srcset', 'cooking_time')
+
+    def get_image_srcset(self, obj):
+        return get_srcset(obj, self.context.get('request'))
 
 
 class ShowFollowersSerializer(BaseUserSerializer):
     """
     Выдача - мои подписки.
     """
-    recipes = ShowFollowerRecipeSerializer(many=True, read_only=True)
+    recipes = serializers.SerializerMethodField()
     recipes_count = serializers.SerializerMethodField('count_author_recipes')
 
     class Meta(BaseUserSerializer.Meta):
@@ -267,8 +235,15 @@ class ShowFollowersSerializer(BaseUserSerializer):
         fields = ('email', 'id', 'username', 'first_name',
                   'last_name', 'is_subscribed', 'recipes', 'recipes_count')
 
+    def get_recipes(self, user):
+        recipes = getattr(user, 'latest_recipes', None)
+        if recipes is None:
+            recipes = user.recipes.all()[:self.context.get('recipes_limit')]
+        return ShowFollowerRecipeSerializer(
+            recipes, many=True, context=self.context).data
+
     def count_author_recipes(self, user):
-        return user.recipes.count()
+        return user.recipes_count
 
 
 class AddIngredientToRecipeSerializer(serializers.ModelSerializer):
@@ -287,7 +262,7 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
     """
     Создание и обновление данных по рецепту.
     """
-    image = Base64ImageField(max_length=None, use_url=True)
+    image = RecipeImageField(max_length=None, use_url=True)
     author = BaseUserSerializer(read_only=True)
     ingredients = AddIngredientToRecipeSerializer(many=True)
     tags = serializers.PrimaryKeyRelatedField(
@@ -307,15 +282,51 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         ]
 
     def create_ingredients(self, recipe, ingredients_data):
-        print(ingredients_data)
         IngredientInRecipe.objects.bulk_create([
             IngredientInRecipe(
-                ingredient=Ingredient.objects.get(id=ingredient['id']),
+                ingredient_id=ingredient['id'],
                 recipe=recipe,
                 amount=ingredient['amount']
             ) for ingredient in ingredients_data
         ])
 
+    def update_ingredients(self, recipe, ingredients_data):
+        """
+        Приводит ингредиенты рецепта к новому списку, трогая только
+        изменившиеся строки. Возвращает True, если что-то поменялось.
+        """
+        amounts = {
+            ingredient['id']: ingredient['amount']
+            for ingredient in ingredients_data
+        }
+        to_delete = []
+        to_update = []
+        # Изменения для итогов списков покупок: количество и число рецептов.
+        deltas = {}
+        for item in recipe.recipes_ingredients_list.all():
+            amount = amounts.pop(item.ingredient_id, None)
+            if amount is None:
+                to_delete.append(item.id)
+                deltas[item.ingredient_id] = (-(item.amount or 0), -1)
+            elif amount != item.amount:
+                deltas[item.ingredient_id] = (amount - (item.amount or 0), 0)
+                item.amount = amount
+                to_update.append(item)
+        if to_delete:
+            IngredientInRecipe.objects.filter(id__in=to_delete).delete()
+        if to_update:
+            IngredientInRecipe.objects.bulk_update(to_update, ['amount'])
+        self.create_ingredients(recipe, [
+            {'id': ingredient_id, 'amount': amount}
+            for ingredient_id, amount in amounts.items()
+        ])
+        deltas.update(
+            (ingredient_id, (amount, 1))
+            for ingredient_id, amount in amounts.items()
+        )
+        apply_recipe_changes(recipe.id, deltas)
+        return bool(deltas)
+
     @transaction.atomic
     def create(self, validated_data):
         ingredients_data = validated_data.pop('ingredients')
@@ -325,25 +336,70 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         recipe.save()
         recipe.tags.set(tags_data)
         self.create_ingredients(recipe, ingredients_data)
+        # Индекс после сохранения рецепта собран ещё без ингредиентов.
+        update_search_index([recipe.id])
+        transaction.on_commit(lambda: schedule_variants(recipe))
         return recipe
 
     @transaction.atomic
     def update(self, instance, validated_data):
         ingredients_data = validated_data.pop('ingredients')
         tags_data = validated_data.pop('tags')
-        IngredientInRecipe.objects.filter(recipe=instance).delete()
-        self.create_ingredients(instance, ingredients_data)
+        ingredients_changed = self.update_ingredients(
+            instance, ingredients_data
+        )
         instance.name = validated_data.pop('name')
         instance.text = validated_data.pop('text')
         if validated_data.get('image') is not None:
             instance.image = validated_data.pop('image')
+            transaction.on_commit(lambda: schedule_variants(instance))
         instance.cooking_time = validated_data.pop('cooking_time')
         instance.save()
         instance.tags.set(tags_data)
+        if ingredients_changed:
+            transaction.on_commit(lambda: bump_recipe_carts(instance))
         return instance
 
+    def validate_ingredients(self, value):
+        ids = {ingredient['id'] for ingredient in value}
+        found = set(Ingredient.objects.filter(
+            id__in=ids).values_list('id', flat=True))
+        missing = ids - found
+        if missing:
+            raise serializers.ValidationError(
+                'Ингредиенты не найдены: '
+                + ', '.join(str(pk) for pk in sorted(missing))
+            )
+        return value
+
+    def to_internal_value(self, data):
+        if isinstance(data, QueryDict):
+            data = self.parse_form_data(data)
+        return super().to_internal_value(data)
+
+    def parse_form_data(self, data):
+        """
+        В multipart/form-data теги передаются повторяющимся полем или
+        json-списком, ингредиенты - json-списком.
+        """
+        result = data.dict()
+        result['tags'] = data.getlist('tags')
+        for field in ('tags', 'ingredients'):
+            value = result.get(field)
+            if isinstance(value, list) and len(value) == 1:
+                value = value[0]
+            if not isinstance(value, str) or not value.startswith('['):
+                continue
+            try:
+                result[field] = json.loads(value)
+            except ValueError:
+                raise serializers.ValidationError({
+                    field: 'Ожидается json-список'
+                })
+        return result
+
     def validate(self, data):
-        ingredients = self.initial_data.get('ingredients')
+        ingredients = data.get('ingredients', [])
         ingredients_list = []
         for ingredient_item in ingredients:
             if ingredient_item['id'] in ingredients_list:
@@ -0,0 +1,82 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from recipes.models import CartTotal, ShoppingList
+
+VERSION_KEY = 'shopping_cart_version:{user_id}'
+ROWS_KEY = 'shopping_cart:{user_id}:{version}'
+SIZE_KEY = 'shopping_cart_size:{user_id}:{version}'
+
+
+def get_cart_version(user_id):
+    """
+    Текущая версия списка покупок пользователя.
+    """
+    return cache.get_or_set(
+        VERSION_KEY.format(user_id=user_id), uuid4().hex, None
+    )
+
+
+def bump_cart_version(*user_ids):
+    """
+    Сбрасывает закешированный список покупок пользователей.
+    """
+    cache.set_many(
+        {VERSION_KEY.format(user_id=user_id): uuid4().hex
+         for user_id in user_ids},
+        None
+    )
+
+
+def bump_recipe_carts(recipe):
+    """
+    Сбрасывает списки покупок всех, у кого рецепт лежит в корзине.
+    """
+    user_ids = ShoppingList.objects.filter(
+        recipe=recipe).values_list('user_id', flat=True)
+    bump_cart_version(*user_ids)
+
+
+def get_cart_ingredients(user):
+    """
+    Суммарный список ингредиентов из корзины пользователя:
+    кортежи (название, единица измерения, количество).
+    """
+    return cached_by_version(
+        ROWS_KEY, user.id, lambda: list(cart_ingredients_queryset(user))
+    )
+
+
+def get_cart_size(user):
+    """
+    Число рецептов в корзине. Считается по базе, а не по кешу связей:
+    тот не знает о каскадном удалении рецептов и правках в админке.
+    """
+    return cached_by_version(
+        SIZE_KEY, user.id,
+        lambda: ShoppingList.objects.filter(user=user).count()
+    )
+
+
+def cached_by_version(key, user_id, load):
+    """
+    Значение, закешированное под текущей версией корзины: любое
+    изменение корзины меняет версию, и load() вызывается заново.
+    """
+    key = key.format(user_id=user_id, version=get_cart_version(user_id))
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        cache.set(key, value, settings.SHOPPING_CART_CACHE_TIMEOUT)
+    return value
+
+
+def cart_ingredients_queryset(user):
+    """
+    Итоги читаются из CartTotal, которую ведут записи в корзину
+    и изменения рецептов.
+    """
+    return CartTotal.objects.filter(user=user).values_list(
+        'ingredient__name', 'ingredient__measurement_unit', 'amount'
+    ).order_by('ingredient__name')
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from recipes.models import Favorite, Ingredient, ShoppingList, Tag
+from users.models import Follow
+
+from .catalog import bump_catalog_version
+from .membership import KINDS, bump_membership
+from .shopping_cart import bump_cart_version
+
+
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+def shopping_list_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_cart_version(instance.user_id))
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingList)
+@receiver(post_delete, sender=ShoppingList)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def link_changed(sender, instance, **kwargs):
+    # Записи из админки и каскадные удаления тоже меняют множества.
+    kind = next(kind for kind, (model, _) in KINDS.items() if model is sender)
+    transaction.on_commit(lambda: bump_membership(instance.user_id, kind))
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_catalog_version('ingredients')
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, **kwargs):
+    bump_catalog_version('tags')
@@ -0,0 +1,76 @@
+import pytest
+from django.core.cache import cache
+from recipes.models import Ingredient, IngredientInRecipe, Recipe, Tag
+from rest_framework.test import APIClient
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        email='user@foodgram.ru', username='user',
+        first_name='Иван', last_name='Иванов', password='pass12345'
+    )
+
+
+@pytest.fixture
+def author(django_user_model):
+    return django_user_model.objects.create_user(
+        email='author@foodgram.ru', username='author',
+        first_name='Пётр', last_name='Петров', password='pass12345'
+    )
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+@pytest.fixture
+def tags():
+    return [
+        Tag.objects.create(name='Завтрак', color='#E26C2D', slug='breakfast'),
+        Tag.objects.create(name='Обед', color='#49B64E', slug='lunch'),
+        Tag.objects.create(name='Ужин', color='#8775D2', slug='dinner'),
+    ]
+
+
+@pytest.fixture
+def ingredients():
+    return [
+        Ingredient.objects.create(name=f'ингредиент {i}', measurement_unit='г')
+        for i in range(10)
+    ]
+
+
+@pytest.fixture
+def make_recipes(tags, ingredients):
+    def make(author, count):
+        recipes = []
+        for i in range(count):
+            recipe = Recipe.objects.create(
+                author=author, name=f'Рецепт {i}', text='Описание',
+                image='recipes/test.jpg', cooking_time=10
+            )
+            recipe.tags.set(tags[:2])
+            IngredientInRecipe.objects.bulk_create([
+                IngredientInRecipe(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                ) for ingredient in ingredients[:3]
+            ])
+            recipes.append(recipe)
+        return recipes
+    return make
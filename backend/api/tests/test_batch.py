@@ -0,0 +1,137 @@
+import pytest
+from recipes.models import CartTotal, Favorite, Recipe, ShoppingList
+from users.models import Follow
+
+FAVORITE_URL = '/api/recipes/favorite/'
+CART_URL = '/api/recipes/shopping_cart/'
+SUBSCRIBE_URL = '/api/users/subscribe/'
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+def statuses(response):
+    assert response.status_code == 200, response.data
+    return [(item['id'], item['status']) for item in response.data['results']]
+
+
+@pytest.fixture
+def recipes(author, make_recipes):
+    return make_recipes(author, 3)
+
+
+@pytest.mark.django_db
+def test_add_favorites(user_client, user, recipes,
+                       django_assert_max_num_queries):
+    first, second, third = recipes
+    Favorite.objects.create(user=user, recipe=first)
+    with django_assert_max_num_queries(6):
+        response = user_client.post(FAVORITE_URL, {
+            'ids': [first.id, second.id, 100500, third.id, second.id]
+        }, format='json')
+    assert statuses(response) == [
+        (first.id, 'exists'), (second.id, 'created'),
+        (100500, 'not_found'), (third.id, 'created'),
+    ]
+    assert Favorite.objects.filter(user=user).count() == 3
+    assert set(Recipe.objects.values_list('favorites_count', flat=True)) == {1}
+    listing = user_client.get('/api/recipes/').data['results']
+    assert all(recipe['is_favorited'] for recipe in listing)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_remove_favorites(user_client, user, recipes):
+    first, second, third = recipes
+    user_client.post(FAVORITE_URL, {'ids': [first.id, second.id]},
+                     format='json')
+    user_client.get('/api/recipes/')
+    response = user_client.delete(FAVORITE_URL, {
+        'ids': [first.id, third.id]
+    }, format='json')
+    assert statuses(response) == [
+        (first.id, 'deleted'), (third.id, 'not_found'),
+    ]
+    assert dict(Recipe.objects.values_list('id', 'favorites_count')) == {
+        first.id: 0, second.id: 1, third.id: 0,
+    }
+    listing = {
+        recipe['id']: recipe['is_favorited']
+        for recipe in user_client.get('/api/recipes/').data['results']
+    }
+    assert listing == {first.id: False, second.id: True, third.id: False}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batch_cart_resets_cached_list(user_client, user, recipes):
+    first, second, _ = recipes
+    user_client.post(CART_URL, {'ids': [first.id]}, format='json')
+    response = user_client.get(DOWNLOAD_URL)
+    assert b''.join(response.streaming_content).decode().startswith(
+        'ингредиент 0 - 100 г')
+    user_client.post(CART_URL, {'ids': [second.id]}, format='json')
+    response = user_client.get(DOWNLOAD_URL)
+    assert b''.join(response.streaming_content).decode().startswith(
+        'ингредиент 0 - 200 г')
+    assert ShoppingList.objects.filter(user=user).count() == 2
+    assert Recipe.objects.get(pk=second.id).in_carts_count == 1
+
+
+@pytest.mark.django_db
+def test_batch_subscribe(user_client, user, author, django_user_model):
+    other = django_user_model.objects.create_user(
+        email='other@foodgram.ru', username='other',
+        first_name='Анна', last_name='Сидорова', password='pass12345'
+    )
+    response = user_client.post(SUBSCRIBE_URL, {
+        'ids': [author.id, user.id, other.id]
+    }, format='json')
+    assert statuses(response) == [
+        (author.id, 'created'), (user.id, 'invalid'), (other.id, 'created'),
+    ]
+    author.refresh_from_db()
+    assert author.followers_count == 1
+    response = user_client.delete(SUBSCRIBE_URL, {
+        'ids': [other.id]
+    }, format='json')
+    assert statuses(response) == [(other.id, 'deleted')]
+    assert list(Follow.objects.values_list('author_id', flat=True)) == [
+        author.id
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('data', [
+    {}, {'ids': []}, {'ids': ['x']}, {'ids': [0]},
+    {'ids': list(range(1, 102))},
+])
+def test_batch_rejects_bad_ids(user_client, data):
+    response = user_client.post(FAVORITE_URL, data, format='json')
+    assert response.status_code == 400
+    assert 'ids' in response.data
+
+
+@pytest.mark.django_db
+def test_batch_requires_auth(api_client, recipes):
+    response = api_client.post(FAVORITE_URL, {'ids': [recipes[0].id]},
+                               format='json')
+    assert response.status_code == 401
+
+
+@pytest.mark.django_db
+def test_batch_counts_only_own_rows(user_client, user, recipes):
+    first, second, _ = recipes
+    # Строка, вставленная параллельным запросом, минуя сигналы.
+    ShoppingList.objects.bulk_create([ShoppingList(user=user, recipe=first)])
+    response = user_client.post(CART_URL, {
+        'ids': [first.id, second.id]
+    }, format='json')
+    assert statuses(response) == [
+        (first.id, 'exists'), (second.id, 'created'),
+    ]
+    assert set(CartTotal.objects.filter(user=user).values_list(
+        'amount', 'recipes')) == {(100, 1)}
+    response = user_client.delete(CART_URL, {
+        'ids': [first.id, second.id]
+    }, format='json')
+    assert statuses(response) == [
+        (first.id, 'deleted'), (second.id, 'deleted'),
+    ]
+    assert not CartTotal.objects.exists()
@@ -0,0 +1,183 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Sum
+from recipes.models import CartTotal, IngredientInRecipe, ShoppingList
+from rest_framework.test import APIClient
+
+RECIPES_URL = '/api/recipes/'
+SUMMARY_URL = '/api/recipes/shopping_cart/summary/'
+
+
+def totals(user):
+    return set(CartTotal.objects.filter(user=user).values_list(
+        'ingredient_id', 'amount'))
+
+
+def aggregated(user):
+    """
+    Итоги, посчитанные заново по корзине.
+    """
+    return set(IngredientInRecipe.objects.filter(
+        recipe__customers__user=user).values('ingredient_id').annotate(
+        total=Sum('amount')).values_list('ingredient_id', 'total'))
+
+
+@pytest.fixture
+def recipes(author, make_recipes):
+    return make_recipes(author, 3)
+
+
+@pytest.fixture
+def author_client(author):
+    client = APIClient()
+    client.force_authenticate(author)
+    return client
+
+
+@pytest.mark.django_db
+def test_cart_changes_update_totals(user_client, user, recipes,
+                                    ingredients):
+    first, second, third = recipes
+    user_client.post(f'{RECIPES_URL}{first.id}/shopping_cart/')
+    user_client.post(f'{RECIPES_URL}shopping_cart/', {
+        'ids': [second.id, third.id]
+    }, format='json')
+    assert totals(user) == {
+        (ingredient.id, 300) for ingredient in ingredients[:3]
+    }
+    user_client.delete(f'{RECIPES_URL}{second.id}/shopping_cart/')
+    user_client.delete(f'{RECIPES_URL}shopping_cart/', {
+        'ids': [third.id]
+    }, format='json')
+    assert totals(user) == aggregated(user)
+    ShoppingList.objects.get(user=user, recipe=first).delete()
+    assert not CartTotal.objects.exists()
+
+
+@pytest.mark.django_db
+def test_recipe_edit_applies_delta(author_client, user_client, user,
+                                   recipes, ingredients, tags):
+    first, second, _ = recipes
+    for recipe in (first, second):
+        ShoppingList.objects.create(user=user, recipe=recipe)
+    response = author_client.patch(f'{RECIPES_URL}{first.id}/', {
+        'name': first.name, 'text': first.text, 'cooking_time': 10,
+        'tags': [tags[0].id],
+        'ingredients': [
+            {'id': ingredients[0].id, 'amount': 100},
+            {'id': ingredients[1].id, 'amount': 40},
+            {'id': ingredients[7].id, 'amount': 5},
+        ],
+    }, format='json')
+    assert response.status_code == 200, response.data
+    assert totals(user) == aggregated(user) == {
+        (ingredients[0].id, 200), (ingredients[1].id, 140),
+        (ingredients[2].id, 100), (ingredients[7].id, 5),
+    }
+
+
+@pytest.mark.django_db
+def test_recipe_delete_updates_totals(user, recipes):
+    first, second, _ = recipes
+    for recipe in (first, second):
+        ShoppingList.objects.create(user=user, recipe=recipe)
+    first.delete()
+    assert totals(user) == aggregated(user)
+    assert CartTotal.objects.filter(user=user, recipes=1).count() == 3
+
+
+@pytest.mark.django_db
+def test_recount_rebuilds_totals(user, author, recipes):
+    ShoppingList.objects.bulk_create([
+        ShoppingList(user=user, recipe=recipe) for recipe in recipes
+    ] + [ShoppingList(user=author, recipe=recipes[0])])
+    out = StringIO()
+    call_command('recount_counters', stdout=out)
+    assert 'итогов списков покупок: 6' in out.getvalue()
+    assert totals(user) == aggregated(user)
+    assert totals(author) == aggregated(author)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_summary(user_client, user, recipes,
+                 django_assert_max_num_queries):
+    user_client.post(f'{RECIPES_URL}shopping_cart/', {
+        'ids': [recipe.id for recipe in recipes[:2]]
+    }, format='json')
+    response = user_client.get(SUMMARY_URL)
+    assert response.status_code == 200
+    assert response.data == {'recipes': 2, 'ingredients': [
+        {'name': f'ингредиент {i}', 'measurement_unit': 'г', 'amount': 200}
+        for i in range(3)
+    ]}
+    with django_assert_max_num_queries(0):
+        response = user_client.get(
+            SUMMARY_URL, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert response.status_code == 304
+    user_client.delete(f'{RECIPES_URL}{recipes[0].id}/shopping_cart/')
+    response = user_client.get(SUMMARY_URL)
+    assert response.data['recipes'] == 1
+    assert response.data['ingredients'][0]['amount'] == 100
+
+
+@pytest.mark.django_db(transaction=True)
+def test_summary_after_recipe_delete(user_client, recipes):
+    first, second, _ = recipes
+    user_client.post(f'{RECIPES_URL}shopping_cart/', {
+        'ids': [first.id, second.id]
+    }, format='json')
+    user_client.get(SUMMARY_URL)
+    first.delete()
+    response = user_client.get(SUMMARY_URL)
+    assert response.data['recipes'] == 1
+    assert [item['amount'] for item in response.data['ingredients']] == [
+        100, 100, 100
+    ]
+
+
+@pytest.fixture
+def admin_client(client, django_user_model):
+    client.force_login(django_user_model.objects.create_superuser(
+        email='admin@foodgram.ru', username='admin',
+        first_name='Админ', last_name='Админов', password='pass12345'
+    ))
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+def test_admin_ingredient_edits_update_totals(admin_client, user_client,
+                                              user, recipes, ingredients):
+    first, second, _ = recipes
+    for recipe in (first, second):
+        ShoppingList.objects.create(user=user, recipe=recipe)
+    user_client.get(SUMMARY_URL)
+    url = '/admin/recipes/ingredientinrecipe/'
+    item = IngredientInRecipe.objects.get(
+        recipe=first, ingredient=ingredients[0]
+    )
+    response = admin_client.post(f'{url}{item.id}/change/', {
+        'recipe': first.id, 'ingredient': ingredients[5].id, 'amount': 150,
+    })
+    assert response.status_code == 302
+    response = admin_client.post(f'{url}add/', {
+        'recipe': second.id, 'ingredient': ingredients[7].id, 'amount': 5,
+    })
+    assert response.status_code == 302
+    item = IngredientInRecipe.objects.get(
+        recipe=second, ingredient=ingredients[1]
+    )
+    response = admin_client.post(f'{url}{item.id}/delete/', {'post': 'yes'})
+    assert response.status_code == 302
+    assert totals(user) == aggregated(user) == {
+        (ingredients[0].id, 100), (ingredients[1].id, 100),
+        (ingredients[2].id, 200), (ingredients[5].id, 150),
+        (ingredients[7].id, 5),
+    }
+    amounts = {
+        item['name']: item['amount']
+        for item in user_client.get(SUMMARY_URL).data['ingredients']
+    }
+    assert amounts['ингредиент 5'] == 150
@@ -0,0 +1,55 @@
+import pytest
+from recipes.models import Ingredient, Tag
+
+TAGS_URL = '/api/tags/'
+INGREDIENTS_URL = '/api/ingredients/'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('url', [TAGS_URL, INGREDIENTS_URL])
+def test_catalog_not_modified(api_client, tags, ingredients, url,
+                              django_assert_num_queries):
+    response = api_client.get(url)
+    assert response.status_code == 200
+    etag = response['ETag']
+    assert response['Last-Modified']
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response['ETag'] == etag
+
+
+@pytest.mark.django_db
+def test_catalog_body_is_cached(api_client, tags,
+                                django_assert_num_queries):
+    first = api_client.get(TAGS_URL)
+    with django_assert_num_queries(0):
+        second = api_client.get(TAGS_URL)
+    assert second.status_code == 200
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_catalog_etag_changes_on_write(api_client, tags, ingredients):
+    tag_etag = api_client.get(TAGS_URL)['ETag']
+    ingredient_etag = api_client.get(INGREDIENTS_URL)['ETag']
+    Tag.objects.create(name='Десерт', color='#FFFFFF', slug='dessert')
+    Ingredient.objects.create(name='корица', measurement_unit='г')
+    response = api_client.get(TAGS_URL, HTTP_IF_NONE_MATCH=tag_etag)
+    assert response.status_code == 200
+    assert len(response.json()) == 4
+    response = api_client.get(
+        INGREDIENTS_URL, HTTP_IF_NONE_MATCH=ingredient_etag
+    )
+    assert response.status_code == 200
+    assert response['ETag'] != ingredient_etag
+
+
+@pytest.mark.django_db
+def test_catalog_detail_has_etag(api_client, tags):
+    response = api_client.get(f'{TAGS_URL}{tags[0].id}/')
+    assert response.status_code == 200
+    assert response['ETag']
+    response = api_client.get(f'{TAGS_URL}100500/')
+    assert response.status_code == 404
+    assert not response.has_header('ETag')
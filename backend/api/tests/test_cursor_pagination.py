@@ -0,0 +1,64 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+RECIPES_URL = '/api/recipes/'
+
+
+def next_params(response):
+    return {
+        key: values[0]
+        for key, values in parse_qs(urlparse(response.data['next']).query,
+                                    keep_blank_values=True).items()
+    }
+
+
+@pytest.mark.django_db
+def test_cursor_walks_all_recipes(api_client, author, make_recipes):
+    recipes = make_recipes(author, 7)
+    seen = []
+    params = {'cursor': '', 'limit': 3}
+    while True:
+        response = api_client.get(RECIPES_URL, params)
+        assert response.status_code == 200
+        assert 'count' not in response.data
+        seen += [recipe['id'] for recipe in response.data['results']]
+        if response.data['next'] is None:
+            break
+        params = next_params(response)
+    assert len(seen) == len(set(seen)) == len(recipes)
+
+
+@pytest.mark.django_db
+def test_cursor_does_not_count(api_client, author, make_recipes,
+                               django_assert_num_queries):
+    make_recipes(author, 3)
+    # рецепты с авторами, теги, ингредиенты - без COUNT(*).
+    with django_assert_num_queries(3):
+        api_client.get(RECIPES_URL, {'cursor': ''})
+
+
+@pytest.mark.django_db
+def test_cursor_count_on_request(api_client, author, make_recipes):
+    make_recipes(author, 4)
+    response = api_client.get(RECIPES_URL, {'cursor': '', 'count': 'true'})
+    assert response.data['count'] == 4
+
+
+@pytest.mark.django_db
+def test_cursor_with_filters(api_client, user, author, make_recipes):
+    make_recipes(author, 3)
+    make_recipes(user, 2)
+    response = api_client.get(
+        RECIPES_URL, {'cursor': '', 'author': user.id, 'count': 1}
+    )
+    assert response.data['count'] == 2
+    authors = {recipe['author']['id'] for recipe in response.data['results']}
+    assert authors == {user.id}
+
+
+@pytest.mark.django_db
+def test_page_number_pagination_by_default(api_client, author, make_recipes):
+    make_recipes(author, 2)
+    response = api_client.get(RECIPES_URL)
+    assert response.data['count'] == 2
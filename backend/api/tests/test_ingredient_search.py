@@ -0,0 +1,57 @@
+import pytest
+from recipes.models import Ingredient
+
+INGREDIENTS_URL = '/api/ingredients/'
+
+
+@pytest.fixture
+def catalog():
+    for name in ('сахар', 'сахарная пудра', 'ванильный сахар',
+                 'ёрш', 'ерунда', 'соль'):
+        Ingredient.objects.create(name=name, measurement_unit='г')
+
+
+def names(response):
+    return [item['name'] for item in response.data]
+
+
+@pytest.mark.django_db
+def test_prefix_matches_first(api_client, catalog):
+    response = api_client.get(INGREDIENTS_URL, {'name': 'Сах'})
+    assert response.status_code == 200
+    assert names(response) == ['сахар', 'сахарная пудра', 'ванильный сахар']
+    assert set(response.data[0]) == {'id', 'name', 'measurement_unit'}
+
+
+@pytest.mark.django_db
+def test_yo_is_normalized(api_client, catalog):
+    response = api_client.get(INGREDIENTS_URL, {'name': 'ер'})
+    assert names(response) == ['ерунда', 'ёрш']
+
+
+@pytest.mark.django_db
+def test_limit(api_client, catalog):
+    response = api_client.get(INGREDIENTS_URL, {'name': 'сах', 'limit': 1})
+    assert names(response) == ['сахар']
+
+
+@pytest.mark.django_db
+def test_full_list_without_query(api_client, catalog):
+    response = api_client.get(INGREDIENTS_URL)
+    assert len(response.data) == 6
+
+
+@pytest.mark.django_db
+def test_search_does_not_touch_database(api_client, catalog,
+                                        django_assert_num_queries):
+    api_client.get(INGREDIENTS_URL, {'name': 'с'})
+    with django_assert_num_queries(0):
+        api_client.get(INGREDIENTS_URL, {'name': 'со'})
+
+
+@pytest.mark.django_db
+def test_index_reloads_on_change(api_client, catalog):
+    api_client.get(INGREDIENTS_URL, {'name': 'мёд'})
+    Ingredient.objects.create(name='мёд', measurement_unit='г')
+    response = api_client.get(INGREDIENTS_URL, {'name': 'мед'})
+    assert names(response) == ['мёд']
@@ -0,0 +1,97 @@
+import pytest
+from api.metrics import MetricsStore, get_store
+from rest_framework.test import APIClient
+
+METRICS_URL = '/api/metrics/'
+
+
+@pytest.fixture
+def metrics(settings, tmp_path):
+    settings.METRICS_ENABLED = True
+    settings.METRICS_STORE = str(tmp_path / 'metrics.sqlite3')
+    get_store.cache_clear()
+    yield
+    get_store.cache_clear()
+
+
+@pytest.fixture
+def staff_client(django_user_model):
+    admin = django_user_model.objects.create_user(
+        email='admin@foodgram.ru', username='admin', first_name='Админ',
+        last_name='Админов', password='pass12345', is_staff=True
+    )
+    client = APIClient()
+    client.force_authenticate(admin)
+    return client
+
+
+def export(client):
+    response = client.get(METRICS_URL)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    return response.content.decode().splitlines()
+
+
+@pytest.mark.django_db
+def test_metrics_require_staff(metrics, api_client, user_client):
+    assert api_client.get(METRICS_URL).status_code == 401
+    assert user_client.get(METRICS_URL).status_code == 403
+
+
+@pytest.mark.django_db
+def test_request_metrics(metrics, api_client, user_client, staff_client,
+                         author, make_recipes):
+    make_recipes(author, 2)
+    api_client.get('/api/recipes/')
+    api_client.get('/api/recipes/')
+    api_client.get('/api/tags/')
+    user_client.get('/api/users/me/')
+    response = user_client.get('/api/recipes/download_shopping_cart/')
+    b''.join(response.streaming_content)
+    lines = export(staff_client)
+    assert '# TYPE foodgram_http_request_duration_seconds histogram' in lines
+    assert ('foodgram_http_requests_total'
+            '{view="recipes-list",method="GET",status="200"} 2') in lines
+    assert ('foodgram_http_requests_total'
+            '{view="customuser-me",method="GET",status="200"} 1') in lines
+    assert ('foodgram_http_request_db_queries_bucket'
+            '{view="recipes-list",method="GET",le="3.0"} 0') not in lines
+    assert ('foodgram_http_request_db_queries_bucket'
+            '{view="recipes-list",method="GET",le="5.0"} 2') in lines
+    assert ('foodgram_http_request_duration_seconds_count'
+            '{view="recipes-list",method="GET"} 2') in lines
+    assert ('foodgram_http_response_size_bytes_count'
+            '{view="dowload_shopping_cart",method="GET"} 1') in lines
+    assert ('foodgram_cache_requests_total'
+            '{prefix="catalog_version",result="hit"} 1') in lines
+    assert ('foodgram_cache_requests_total'
+            '{prefix="catalog_body",result="miss"} 1') in lines
+
+
+@pytest.mark.django_db
+def test_histogram_buckets_are_ordered(metrics, api_client, staff_client):
+    api_client.get('/api/tags/')
+    lines = export(staff_client)
+    buckets = [
+        line for line in lines if line.startswith(
+            'foodgram_http_request_duration_seconds_bucket{view="tags-list"'
+        )
+    ]
+    assert buckets[-1].startswith(
+        'foodgram_http_request_duration_seconds_bucket'
+        '{view="tags-list",method="GET",le="+Inf"}'
+    )
+    counts = [int(line.rsplit(' ', 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+
+
+def test_store_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / 'metrics.sqlite3')
+    first = MetricsStore(path, flush_interval=60)
+    second = MetricsStore(path, flush_interval=60)
+    labels = (('view', 'recipes-list'),)
+    first.inc('foodgram_http_requests_total', labels)
+    second.inc('foodgram_http_requests_total', labels, 2)
+    second.flush()
+    assert ('foodgram_http_requests_total{view="recipes-list"} 3'
+            in first.export().splitlines())
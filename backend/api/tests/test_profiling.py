@@ -0,0 +1,109 @@
+import marshal
+
+import pytest
+from api.models import RequestProfile
+from django.test import Client
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=user).key}'
+    )
+    return client
+
+
+@pytest.fixture
+def staff(django_user_model):
+    return django_user_model.objects.create_user(
+        email='admin@foodgram.ru', username='admin', first_name='Админ',
+        last_name='Админов', password='pass12345', is_staff=True,
+        is_superuser=True
+    )
+
+
+@pytest.fixture
+def recipes(author, make_recipes):
+    return make_recipes(author, 2)
+
+
+@pytest.mark.django_db
+def test_profile_is_stored_for_staff(staff, recipes):
+    response = token_client(staff).get('/api/recipes/', {'profile': 1})
+    assert response.status_code == 200
+    assert len(response.data['results']) == 2
+    profile = RequestProfile.objects.get(pk=response['X-Profile-Id'])
+    assert profile.user == staff
+    assert profile.path == '/api/recipes/?profile=1'
+    assert profile.query_count >= 4
+    assert 'function calls' in profile.summary
+    assert 'recipes_ingredientinrecipe' in profile.sql
+    # Токен - параметр запроса аутентификации, его в профиле быть не должно.
+    assert Token.objects.get(user=staff).key not in profile.sql
+    assert marshal.loads(bytes(profile.stats))
+
+
+@pytest.mark.django_db
+def test_profile_ignored_for_other_users(user, recipes):
+    response = token_client(user).get('/api/recipes/', {'profile': 1})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response
+    assert not RequestProfile.objects.exists()
+
+
+@pytest.mark.django_db
+def test_profile_text_for_djoser_view(staff):
+    response = token_client(staff).get(
+        '/api/users/me/', HTTP_X_PROFILE='text'
+    )
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    report = response.content.decode()
+    assert report.startswith('GET /api/users/me/ 200')
+    assert 'function calls' in report
+    assert not RequestProfile.objects.exists()
+
+
+@pytest.mark.django_db
+def test_profile_pstats_for_streamed_response(staff, recipes):
+    client = token_client(staff)
+    client.post(f'/api/recipes/{recipes[0].id}/shopping_cart/')
+    response = client.get(
+        '/api/recipes/download_shopping_cart/', {'profile': 'pstats'}
+    )
+    assert response['Content-Disposition'].endswith('.prof')
+    stats = marshal.loads(response.content)
+    assert any(
+        function == 'stream' for _, _, function in stats
+    )
+
+
+@pytest.mark.django_db
+def test_profiles_in_admin(staff, recipes):
+    token_client(staff).get('/api/recipes/', {'profile': 1})
+    profile = RequestProfile.objects.get()
+    client = Client()
+    client.force_login(staff)
+    url = f'/admin/api/requestprofile/{profile.pk}/'
+    assert client.get('/admin/api/requestprofile/').status_code == 200
+    response = client.get(f'{url}change/')
+    assert response.status_code == 200
+    assert 'function calls' in response.content.decode()
+    response = client.get(f'{url}pstats/')
+    assert response.content == bytes(profile.stats)
+
+
+@pytest.mark.django_db
+def test_profile_download_requires_view_permission(staff, django_user_model):
+    token_client(staff).get('/api/recipes/', {'profile': 1})
+    profile = RequestProfile.objects.get()
+    other = django_user_model.objects.create_user(
+        email='staff@foodgram.ru', username='staff', first_name='Сотрудник',
+        last_name='Сотрудников', password='pass12345', is_staff=True
+    )
+    client = Client()
+    client.force_login(other)
+    response = client.get(f'/admin/api/requestprofile/{profile.pk}/pstats/')
+    assert response.status_code == 403
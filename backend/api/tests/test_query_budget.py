@@ -0,0 +1,120 @@
+import pytest
+from api.membership import MEMBERSHIP_KEY, MEMBERSHIP_VERSION_KEY
+from django.core.cache import cache
+from recipes.models import Favorite, ShoppingList
+from users.models import Follow
+
+RECIPES_URL = '/api/recipes/'
+
+# Запросы на страницу списка: count, рецепты с авторами, теги, ингредиенты.
+LIST_QUERIES = 4
+# Детальный рецепт: тот же набор без count.
+DETAIL_QUERIES = 3
+# Избранное, корзина и подписки пользователя при пустом кеше.
+MEMBERSHIP_QUERIES = 3
+
+
+@pytest.fixture
+def recipes(author, make_recipes):
+    return make_recipes(author, 60)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit', [5, 50])
+def test_recipe_list_anonymous(api_client, recipes, limit,
+                               django_assert_num_queries):
+    with django_assert_num_queries(LIST_QUERIES):
+        response = api_client.get(RECIPES_URL, {'limit': limit})
+    assert response.status_code == 200
+    assert len(response.data['results']) == limit
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('limit', [5, 50])
+def test_recipe_list_authenticated(user, author, user_client, recipes, limit,
+                                   django_assert_num_queries):
+    Follow.objects.create(user=user, author=author)
+    Favorite.objects.bulk_create([
+        Favorite(user=user, recipe=recipe) for recipe in recipes
+    ])
+    with django_assert_num_queries(LIST_QUERIES + MEMBERSHIP_QUERIES):
+        response = user_client.get(RECIPES_URL, {'limit': limit})
+    assert response.status_code == 200
+    results = response.data['results']
+    assert len(results) == limit
+    assert all(recipe['author']['is_subscribed'] for recipe in results)
+    assert all(recipe['is_favorited'] for recipe in results)
+    assert not any(recipe['is_in_shopping_cart'] for recipe in results)
+    assert len(results[0]['ingredients']) == 3
+    assert len(results[0]['tags']) == 2
+
+
+@pytest.mark.django_db
+def test_recipe_detail(user_client, recipes, django_assert_num_queries):
+    with django_assert_num_queries(DETAIL_QUERIES + MEMBERSHIP_QUERIES):
+        response = user_client.get(f'{RECIPES_URL}{recipes[0].id}/')
+    assert response.status_code == 200
+    assert response.data['ingredients'][0]['name'] == 'ингредиент 0'
+    assert response.data['is_in_shopping_cart'] is False
+
+
+@pytest.mark.django_db
+def test_recipe_detail_in_cart(user, user_client, recipes):
+    ShoppingList.objects.create(user=user, recipe=recipes[0])
+    response = user_client.get(f'{RECIPES_URL}{recipes[0].id}/')
+    assert response.data['is_in_shopping_cart'] is True
+    assert response.data['is_favorited'] is False
+
+
+@pytest.mark.django_db
+def test_membership_is_cached(user, user_client, recipes,
+                              django_assert_num_queries):
+    user_client.get(RECIPES_URL)
+    with django_assert_num_queries(LIST_QUERIES):
+        user_client.get(RECIPES_URL)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_membership_write_through(user_client, recipes):
+    recipe = recipes[0]
+    user_client.get(f'{RECIPES_URL}{recipe.id}/')
+    user_client.post(f'{RECIPES_URL}{recipe.id}/favorite/')
+    user_client.post(f'{RECIPES_URL}{recipe.id}/shopping_cart/')
+    user_client.post(f'/api/users/{recipe.author_id}/subscribe/')
+    data = user_client.get(f'{RECIPES_URL}{recipe.id}/').data
+    assert data['is_favorited'] is True
+    assert data['is_in_shopping_cart'] is True
+    assert data['author']['is_subscribed'] is True
+    user_client.delete(f'{RECIPES_URL}{recipe.id}/favorite/')
+    user_client.delete(f'/api/users/{recipe.author_id}/subscribe/')
+    data = user_client.get(f'{RECIPES_URL}{recipe.id}/').data
+    assert data['is_favorited'] is False
+    assert data['author']['is_subscribed'] is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stale_membership_is_not_read(user, user_client, recipes):
+    recipe = recipes[0]
+    user_client.get(f'{RECIPES_URL}{recipe.id}/')
+    version = cache.get(MEMBERSHIP_VERSION_KEY.format(
+        kind='favorites', user_id=user.id))
+    user_client.post(f'{RECIPES_URL}{recipe.id}/favorite/')
+    # Параллельный запрос прочитал базу до записи и положил старое
+    # множество под свою версию уже после неё.
+    cache.set(MEMBERSHIP_KEY.format(
+        kind='favorites', user_id=user.id, version=version), set())
+    data = user_client.get(f'{RECIPES_URL}{recipe.id}/').data
+    assert data['is_favorited'] is True
+
+
+@pytest.mark.django_db(transaction=True)
+def test_membership_follows_orm_writes(user, user_client, recipes):
+    recipe = recipes[0]
+    user_client.get(f'{RECIPES_URL}{recipe.id}/')
+    # Запись из админки идёт через ORM, мимо API.
+    favorite = Favorite.objects.create(user=user, recipe=recipe)
+    assert user_client.get(
+        f'{RECIPES_URL}{recipe.id}/').data['is_favorited'] is True
+    favorite.delete()
+    assert user_client.get(
+        f'{RECIPES_URL}{recipe.id}/').data['is_favorited'] is False
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+from api.shopping_cart import cart_ingredients_queryset
+from django.db import connection
+from recipes.models import Favorite, IngredientInRecipe, Recipe, ShoppingList
+from recipes.search import search_recipes
+from users.models import Follow
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor not in ('sqlite', 'postgresql'),
+        reason='EXPLAIN разбирается только для sqlite и postgresql'
+    ),
+]
+
+SQLITE_FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+( AS \w+)?$')
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        # На пустых тестовых таблицах postgres всегда выбирает seq scan,
+        # поэтому проверяем, что у планировщика есть индекс.
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+def assert_uses_indexes(queryset, ordered=False):
+    plan = explain(queryset)
+    if connection.vendor == 'postgresql':
+        assert 'Seq Scan' not in plan, plan
+        if ordered:
+            assert 'Sort' not in plan, plan
+        return
+    for line in plan.splitlines():
+        assert not SQLITE_FULL_SCAN.search(line.strip()), plan
+    if ordered:
+        assert 'FOR ORDER BY' not in plan, plan
+
+
+HOT_QUERIES = {
+    'favorite_lookup': lambda: Favorite.objects.filter(
+        user_id=1, recipe_id=1),
+    'favorites_of_user': lambda: Favorite.objects.filter(
+        user_id=1).values_list('recipe_id', flat=True),
+    'cart_lookup': lambda: ShoppingList.objects.filter(
+        user_id=1, recipe_id=1),
+    'cart_of_user': lambda: ShoppingList.objects.filter(
+        user_id=1).values_list('recipe_id', flat=True),
+    'follows_of_user': lambda: Follow.objects.filter(
+        user_id=1).values_list('author_id', flat=True),
+    'ingredients_of_recipes': lambda: IngredientInRecipe.objects.filter(
+        recipe_id__in=[1, 2, 3]),
+    'cart_aggregation': lambda: cart_ingredients_queryset(1),
+    'recipes_by_tags': lambda: Recipe.objects.filter(
+        tags_mask__in=[1, 3, 5, 7]),
+    'recipe_search': lambda: search_recipes(
+        Recipe.objects.all(), 'сырники с творогом'),
+}
+
+ORDERED_QUERIES = {
+    'recipe_feed': lambda: Recipe.objects.order_by('-pub_date', '-id')[:6],
+    'author_feed': lambda: Recipe.objects.filter(
+        author_id=1).order_by('-pub_date', '-id')[:6],
+}
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_indexes(name):
+    assert_uses_indexes(HOT_QUERIES[name]())
+
+
+@pytest.mark.parametrize('name', ORDERED_QUERIES)
+def test_feed_is_ordered_by_index(name):
+    assert_uses_indexes(ORDERED_QUERIES[name](), ordered=True)
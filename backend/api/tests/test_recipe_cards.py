@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from api.recipe_cards import recipe_rows, render_recipes
+from api.serializers import ListRecipeSerializer
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Prefetch
+from recipes.models import Favorite, IngredientInRecipe, Recipe, ShoppingList
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from users.models import Follow
+
+RECIPES_URL = '/api/recipes/'
+
+
+@pytest.fixture
+def recipes(user, author, make_recipes):
+    recipes = make_recipes(author, 4) + make_recipes(user, 1)
+    Recipe.objects.filter(pk=recipes[0].pk).update(
+        image_variants_for='recipes/test.jpg'
+    )
+    Recipe.objects.filter(pk=recipes[1].pk).update(image='')
+    Follow.objects.create(user=user, author=author)
+    Favorite.objects.create(user=user, recipe=recipes[0])
+    ShoppingList.objects.create(user=user, recipe=recipes[2])
+    return recipes
+
+
+def serializer_data(user, url=RECIPES_URL):
+    request = Request(APIRequestFactory().get(url))
+    request.user = user
+    queryset = Recipe.objects.select_related('author').prefetch_related(
+        'tags',
+        Prefetch(
+            'recipes_ingredients_list',
+            queryset=IngredientInRecipe.objects.select_related('ingredient')
+        ),
+    )
+    return request, ListRecipeSerializer(
+        queryset, many=True, context={'request': request}
+    ).data
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+def test_cards_match_serializer(user, recipes):
+    request, expected = serializer_data(user)
+    actual = render_recipes(
+        recipe_rows(Recipe.objects.all()), {'request': request}
+    )
+    assert render(actual) == render(expected)
+
+
+@pytest.mark.django_db
+def test_cards_match_serializer_for_anonymous(recipes):
+    request, expected = serializer_data(AnonymousUser())
+    actual = render_recipes(
+        recipe_rows(Recipe.objects.all()), {'request': request}
+    )
+    assert render(actual) == render(expected)
+
+
+@pytest.mark.django_db
+def test_api_responses_match_serializer(user, user_client, recipes):
+    _, expected = serializer_data(user)
+    response = user_client.get(RECIPES_URL, {'limit': 10})
+    assert json.loads(response.content)['results'] == json.loads(
+        render(expected)
+    )
+    response = user_client.get(f'{RECIPES_URL}{recipes[0].id}/')
+    assert response.content == render(
+        [card for card in expected if card['id'] == recipes[0].id][0]
+    )
+    assert user_client.get(f'{RECIPES_URL}0/').status_code == 404
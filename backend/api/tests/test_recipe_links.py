@@ -0,0 +1,103 @@
+import pytest
+from api.links import add_recipe
+from api.membership import get_membership
+from api.shopping_cart import get_cart_version
+from django.db import transaction
+from recipes.models import Favorite, Recipe, ShoppingList
+
+RECIPES_URL = '/api/recipes/'
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+@pytest.fixture
+def recipe(author, make_recipes):
+    return make_recipes(author, 1)[0]
+
+
+def counters(recipe):
+    recipe.refresh_from_db()
+    return recipe.favorites_count, recipe.in_carts_count
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('action, model', [
+    ('favorite', Favorite), ('shopping_cart', ShoppingList),
+])
+def test_add_is_idempotent(user_client, user, recipe, action, model,
+                           django_assert_max_num_queries):
+    url = f'{RECIPES_URL}{recipe.id}/{action}/'
+    # Для корзины ещё обновляются итоги списка покупок.
+    with django_assert_max_num_queries(4):
+        response = user_client.post(url)
+    assert response.status_code == 201
+    assert response.data['id'] == recipe.id
+    assert response.data['name'] == recipe.name
+    response = user_client.post(url)
+    assert response.status_code == 200
+    assert response.data['id'] == recipe.id
+    assert model.objects.filter(user=user, recipe=recipe).count() == 1
+    assert counters(recipe) == (
+        (1, 0) if model is Favorite else (0, 1)
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('action', ['favorite', 'shopping_cart'])
+def test_remove(user_client, recipe, action):
+    url = f'{RECIPES_URL}{recipe.id}/{action}/'
+    user_client.post(url)
+    assert user_client.delete(url).status_code == 204
+    assert user_client.delete(url).status_code == 404
+    assert counters(recipe) == (0, 0)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('action', ['favorite', 'shopping_cart'])
+def test_unknown_recipe(user_client, action):
+    url = f'{RECIPES_URL}100500/{action}/'
+    assert user_client.post(url).status_code == 404
+    assert user_client.delete(url).status_code == 404
+
+
+@pytest.mark.django_db
+def test_row_inserted_concurrently_is_not_counted(user_client, user, recipe):
+    # Строка, вставленная параллельным запросом после нашей проверки.
+    Favorite.objects.bulk_create([Favorite(user=user, recipe=recipe)])
+    response = user_client.post(f'{RECIPES_URL}{recipe.id}/favorite/')
+    assert response.status_code == 200
+    assert Recipe.objects.get(pk=recipe.id).favorites_count == 0
+
+
+@pytest.mark.django_db
+def test_remove_with_drifted_counter(user_client, user, recipe):
+    Favorite.objects.bulk_create([Favorite(user=user, recipe=recipe)])
+    assert counters(recipe) == (0, 0)
+    url = f'{RECIPES_URL}{recipe.id}/favorite/'
+    assert user_client.delete(url).status_code == 204
+    assert counters(recipe) == (0, 0)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cart_changes_reset_cached_list(user_client, recipe):
+    def download():
+        response = user_client.get(DOWNLOAD_URL)
+        return b''.join(response.streaming_content).decode()
+
+    url = f'{RECIPES_URL}{recipe.id}/shopping_cart/'
+    assert 'ингредиент' not in download()
+    user_client.post(url)
+    assert download().startswith('ингредиент 0 - 100 г')
+    user_client.delete(url)
+    assert 'ингредиент' not in download()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_link_keeps_cache(user, recipe):
+    version = get_cart_version(user.id)
+    assert get_membership(user.id, 'shopping_cart') == set()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            assert add_recipe(user, 'shopping_cart', recipe.id)
+            raise RuntimeError
+    assert get_membership(user.id, 'shopping_cart') == set()
+    assert get_cart_version(user.id) == version
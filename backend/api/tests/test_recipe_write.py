@@ -0,0 +1,174 @@
+import base64
+import json
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from recipes.models import ImageBlob, IngredientInRecipe, Recipe
+
+RECIPES_URL = '/api/recipes/'
+IMAGE = (
+    'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAgMAAABieywaAAAA'
+    'CVBMVEUAAAD///9fX1/S0ecCAAAACXBIWXMAAA7EAAAOxAGVKw4bAAAACklEQVQImWNo'
+    'AAAAggCByxOyYQAAAABJRU5ErkJggg=='
+)
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture
+def payload(tags, ingredients):
+    return {
+        'name': 'Сырники',
+        'text': 'Смешать и пожарить',
+        'cooking_time': 20,
+        'image': IMAGE,
+        'tags': [tags[0].id],
+        'ingredients': [
+            {'id': ingredient.id, 'amount': 100}
+            for ingredient in ingredients[:3]
+        ],
+    }
+
+
+@pytest.fixture
+def recipe(user_client, payload):
+    response = user_client.post(RECIPES_URL, payload, format='json')
+    assert response.status_code == 201, response.data
+    return response.data
+
+
+@pytest.mark.django_db
+def test_create_recipe(recipe):
+    assert len(recipe['ingredients']) == 3
+    assert recipe['ingredients'][0]['amount'] == 100
+
+
+@pytest.mark.django_db
+def test_create_recipe_counts_image_once(recipe):
+    image = Recipe.objects.get(pk=recipe['id']).image.name
+    assert list(ImageBlob.objects.values_list('name', 'references')) == [
+        (image, 1)
+    ]
+
+
+@pytest.mark.django_db
+def test_update_recipe_counts_image_references(user_client, payload, recipe):
+    url = f'{RECIPES_URL}{recipe["id"]}/'
+    image = Recipe.objects.get(pk=recipe['id']).image.name
+    for _ in range(2):
+        response = user_client.put(url, payload, format='json')
+        assert response.status_code == 200, response.data
+    assert dict(ImageBlob.objects.values_list('name', 'references')) == {
+        image: 1
+    }
+    payload['image'] = (
+        'data:image/png;base64,'
+        + base64.b64encode(png(40, 30).getvalue()).decode()
+    )
+    response = user_client.put(url, payload, format='json')
+    assert response.status_code == 200, response.data
+    new_image = Recipe.objects.get(pk=recipe['id']).image.name
+    assert new_image != image
+    assert dict(ImageBlob.objects.values_list('name', 'references')) == {
+        image: 0, new_image: 1
+    }
+
+
+@pytest.mark.django_db
+def test_create_recipe_unknown_ingredient(user_client, payload):
+    payload['ingredients'].append({'id': 100500, 'amount': 1})
+    response = user_client.post(RECIPES_URL, payload, format='json')
+    assert response.status_code == 400
+    assert 'ingredients' in response.data
+
+
+@pytest.mark.django_db
+def test_update_recipe_diffs_ingredients(user_client, payload, recipe,
+                                         ingredients):
+    url = f'{RECIPES_URL}{recipe["id"]}/'
+    kept = IngredientInRecipe.objects.get(
+        recipe_id=recipe['id'], ingredient=ingredients[0]
+    )
+    payload['ingredients'] = [
+        {'id': ingredients[0].id, 'amount': 100},
+        {'id': ingredients[1].id, 'amount': 250},
+        {'id': ingredients[5].id, 'amount': 3},
+    ]
+    response = user_client.patch(url, payload, format='json')
+    assert response.status_code == 200, response.data
+    rows = IngredientInRecipe.objects.filter(recipe_id=recipe['id'])
+    assert {(row.ingredient_id, row.amount) for row in rows} == {
+        (ingredients[0].id, 100),
+        (ingredients[1].id, 250),
+        (ingredients[5].id, 3),
+    }
+    assert rows.get(ingredient=ingredients[0]).id == kept.id
+
+
+@pytest.mark.django_db
+def test_update_text_only_keeps_ingredient_rows(user_client, payload, recipe):
+    url = f'{RECIPES_URL}{recipe["id"]}/'
+    ids = set(IngredientInRecipe.objects.filter(
+        recipe_id=recipe['id']).values_list('id', flat=True))
+    payload['text'] = 'Новый текст'
+    response = user_client.patch(url, payload, format='json')
+    assert response.status_code == 200
+    assert response.data['text'] == 'Новый текст'
+    assert set(IngredientInRecipe.objects.filter(
+        recipe_id=recipe['id']).values_list('id', flat=True)) == ids
+
+
+def png(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'white').save(buffer, 'PNG')
+    buffer.seek(0)
+    buffer.name = 'photo.png'
+    return buffer
+
+
+@pytest.fixture
+def form_payload(payload):
+    payload = dict(payload)
+    payload['image'] = png(40, 30)
+    payload['ingredients'] = json.dumps(payload['ingredients'])
+    return payload
+
+
+@pytest.mark.django_db
+def test_create_recipe_multipart(user_client, form_payload):
+    response = user_client.post(RECIPES_URL, form_payload, format='multipart')
+    assert response.status_code == 201, response.data
+    assert len(response.data['ingredients']) == 3
+    assert response.data['image'].endswith('.png')
+
+
+@pytest.mark.django_db
+def test_multipart_upload_size_limit(settings, user_client, form_payload):
+    settings.RECIPE_IMAGE_MAX_SIZE = 10
+    response = user_client.post(RECIPES_URL, form_payload, format='multipart')
+    assert response.status_code == 413
+
+
+@pytest.mark.django_db
+def test_multipart_upload_dimensions_limit(settings, user_client,
+                                           form_payload):
+    settings.RECIPE_IMAGE_MAX_SIDE = 20
+    response = user_client.post(RECIPES_URL, form_payload, format='multipart')
+    assert response.status_code == 400
+    assert 'image' in response.data
+
+
+@pytest.mark.django_db
+def test_base64_upload_dimensions_limit(settings, user_client, payload):
+    payload['image'] = (
+        'data:image/png;base64,'
+        + base64.b64encode(png(40, 30).getvalue()).decode()
+    )
+    settings.RECIPE_IMAGE_MAX_PIXELS = 1000
+    response = user_client.post(RECIPES_URL, payload, format='json')
+    assert response.status_code == 400
+    assert 'image' in response.data
@@ -0,0 +1,110 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from recipes.models import Ingredient, IngredientInRecipe, Recipe
+from recipes.search import terms
+
+RECIPES_URL = '/api/recipes/'
+
+
+def search(client, query):
+    response = client.get(RECIPES_URL, {'search': query})
+    assert response.status_code == 200
+    assert response.data['count'] == len(response.data['results'])
+    return [recipe['name'] for recipe in response.data['results']]
+
+
+@pytest.fixture
+def recipes(author, ingredients):
+    cottage_cheese = Ingredient.objects.create(
+        name='Творог', measurement_unit='г'
+    )
+    data = [
+        ('Сырники', 'Творог размять с яйцом.', [cottage_cheese]),
+        ('Оладьи', 'Подавать как сырники, со сметаной.', ingredients[:2]),
+        ('Борщ', 'Свёклу натереть.', ingredients[2:4]),
+    ]
+    recipes = []
+    for name, text, recipe_ingredients in data:
+        recipe = Recipe.objects.create(
+            author=author, name=name, text=text,
+            image='recipes/test.jpg', cooking_time=10
+        )
+        IngredientInRecipe.objects.bulk_create([
+            IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=1)
+            for ingredient in recipe_ingredients
+        ])
+        recipes.append(recipe)
+    # Ингредиенты добавлены bulk_create, индекс надо перестроить.
+    out = StringIO()
+    call_command('rebuild_search_index', stdout=out)
+    assert 'Проиндексировано рецептов: 3' in out.getvalue()
+    return recipes
+
+
+def test_terms_drop_endings():
+    assert terms('Свёклу, СЫРНИКИ и котлеты!') == [
+        'свекл', 'сырник', 'котлет'
+    ]
+    assert terms('сырник') == ['сырник']
+    assert terms('Морковь с морковью') == ['морков', 'морков']
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_above_text(api_client, recipes):
+    assert search(api_client, 'сырник') == ['Сырники', 'Оладьи']
+    assert search(api_client, 'свекла') == ['Борщ']
+    assert search(api_client, 'пельмени') == []
+
+
+@pytest.mark.django_db
+def test_search_matches_ingredients_and_all_words(api_client, recipes):
+    assert search(api_client, 'творог') == ['Сырники']
+    # При равной релевантности новые рецепты идут первыми.
+    assert search(api_client, 'ингредиент') == ['Борщ', 'Оладьи']
+    assert search(api_client, 'ингредиент 3') == ['Борщ']
+    assert search(api_client, 'ингредиент творог') == []
+
+
+@pytest.mark.django_db
+def test_search_matches_inflected_words(api_client, recipes, ingredients):
+    ingredients[0].name = 'Морковь'
+    ingredients[0].save()
+    ingredients[2].name = 'Лук'
+    ingredients[2].save()
+    assert search(api_client, 'морковью') == ['Оладьи']
+    assert search(api_client, 'творогом') == ['Сырники']
+    assert search(api_client, 'луковый') == ['Борщ']
+
+
+@pytest.mark.django_db
+def test_search_follows_changes(api_client, recipes, ingredients):
+    syrniki, oladyi, borsch = recipes
+    borsch.name = 'Щи'
+    borsch.save()
+    assert search(api_client, 'борщ') == []
+    assert search(api_client, 'щи') == ['Щи']
+    ingredients[0].name = 'Мука'
+    ingredients[0].save()
+    assert search(api_client, 'мука') == ['Оладьи']
+
+
+@pytest.mark.django_db
+def test_created_recipe_is_searchable(user_client, tags, ingredients,
+                                      settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    response = user_client.post(RECIPES_URL, {
+        'name': 'Запеканка',
+        'text': 'Запечь в духовке',
+        'cooking_time': 40,
+        'image': (
+            'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABAgMAAABi'
+            'eywaAAAACVBMVEUAAAD///9fX1/S0ecCAAAACXBIWXMAAA7EAAAOxAGVKw4bAAA'
+            'ACklEQVQImWNoAAAAggCByxOyYQAAAABJRU5ErkJggg=='
+        ),
+        'tags': [tags[0].id],
+        'ingredients': [{'id': ingredients[5].id, 'amount': 10}],
+    }, format='json')
+    assert response.status_code == 201, response.data
+    assert search(user_client, 'ингредиент 5') == ['Запеканка']
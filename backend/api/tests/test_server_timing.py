@@ -0,0 +1,64 @@
+import logging
+import re
+
+import pytest
+from api.timing import collect_stats
+from recipes.models import Tag
+
+RECIPES_URL = '/api/recipes/'
+
+
+@pytest.fixture
+def recipes(author, make_recipes):
+    return make_recipes(author, 3)
+
+
+def parse(header):
+    metrics = {}
+    for item in header.split(', '):
+        name, *params = item.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+def test_disabled_by_default(api_client, recipes):
+    assert 'Server-Timing' not in api_client.get(RECIPES_URL)
+
+
+@pytest.mark.django_db
+def test_server_timing_header(settings, api_client, recipes):
+    settings.SERVER_TIMING_ENABLED = True
+    settings.SLOW_REQUEST_THRESHOLD = 10 ** 6
+    response = api_client.get(RECIPES_URL)
+    metrics = parse(response['Server-Timing'])
+    assert set(metrics) == {'db', 'serialize', 'total'}
+    assert metrics['db']['desc'] == '"4 queries"'
+    assert float(metrics['serialize']['dur']) > 0
+    assert float(metrics['total']['dur']) >= float(metrics['db']['dur'])
+
+
+@pytest.mark.django_db
+def test_slow_request_is_logged(settings, api_client, recipes, caplog):
+    settings.SERVER_TIMING_ENABLED = True
+    settings.SLOW_REQUEST_THRESHOLD = 0
+    with caplog.at_level(logging.WARNING, logger='api.middleware'):
+        api_client.get(f'{RECIPES_URL}{recipes[0].id}/')
+        api_client.get(RECIPES_URL, {'limit': 1})
+    detail, listing = caplog.messages
+    assert detail.startswith(f'GET {RECIPES_URL}{recipes[0].id}/ 200')
+    assert re.search(r'SQL: 3 за', detail)
+    assert listing.startswith(f'GET {RECIPES_URL}?limit=1 200')
+
+
+@pytest.mark.django_db
+def test_duplicated_queries(tags):
+    with collect_stats() as stats:
+        for tag in tags:
+            Tag.objects.get(pk=tag.pk)
+        Tag.objects.count()
+    assert len(stats.queries) == 4
+    [(sql, count)] = stats.duplicated()
+    assert count == 3
+    assert 'WHERE' in sql
+    assert stats.total_time >= stats.db_time
@@ -0,0 +1,72 @@
+import pytest
+from recipes.models import ShoppingList
+
+DOWNLOAD_URL = '/api/recipes/download_shopping_cart/'
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.fixture
+def cart(user, author, make_recipes):
+    recipes = make_recipes(author, 2)
+    for recipe in recipes:
+        ShoppingList.objects.create(user=user, recipe=recipe)
+    return recipes
+
+
+@pytest.mark.django_db
+def test_download_txt(user_client, cart):
+    response = user_client.get(DOWNLOAD_URL)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/plain'
+    assert 'wishlist.txt' in response['Content-Disposition']
+    lines = content(response).decode().splitlines()
+    assert lines[0] == 'ингредиент 0 - 200 г'
+    assert len(lines) == 4
+
+
+@pytest.mark.django_db
+def test_download_csv(user_client, cart):
+    response = user_client.get(DOWNLOAD_URL, {'format': 'csv'})
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/csv'
+    lines = content(response).decode().splitlines()
+    assert lines == [
+        'name,measurement_unit,amount',
+        'ингредиент 0,г,200',
+        'ингредиент 1,г,200',
+        'ингредиент 2,г,200',
+    ]
+
+
+@pytest.mark.django_db
+def test_download_pdf(user_client, cart):
+    response = user_client.get(DOWNLOAD_URL, {'format': 'pdf'})
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/pdf'
+    assert content(response).startswith(b'%PDF')
+
+
+@pytest.mark.django_db
+def test_download_unknown_format(user_client, cart):
+    response = user_client.get(DOWNLOAD_URL, {'format': 'xls'})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db(transaction=True)
+def test_download_is_cached(user, user_client, cart,
+                            django_assert_num_queries):
+    content(user_client.get(DOWNLOAD_URL))
+    with django_assert_num_queries(0):
+        content(user_client.get(DOWNLOAD_URL))
+    ShoppingList.objects.filter(user=user, recipe=cart[0]).delete()
+    lines = content(user_client.get(DOWNLOAD_URL)).decode().splitlines()
+    assert lines[0] == 'ингредиент 0 - 100 г'
+
+
+@pytest.mark.django_db
+def test_download_anonymous(api_client):
+    response = api_client.get(DOWNLOAD_URL)
+    assert response.status_code == 401
@@ -0,0 +1,61 @@
+import pytest
+from users.models import Follow
+
+SUBSCRIPTIONS_URL = '/api/users/subscriptions/'
+
+
+@pytest.fixture
+def authors(user, django_user_model, make_recipes):
+    authors = []
+    for i in range(3):
+        author = django_user_model.objects.create_user(
+            email=f'author{i}@foodgram.ru', username=f'author{i}',
+            first_name='Автор', last_name=str(i), password='pass12345'
+        )
+        make_recipes(author, 5)
+        Follow.objects.create(user=user, author=author)
+        authors.append(author)
+    return authors
+
+
+@pytest.mark.django_db
+def test_subscriptions_recipes_limit(user_client, authors,
+                                     django_assert_num_queries):
+    # count, авторы страницы, рецепты одним оконным запросом
+    # и подписки пользователя при пустом кеше.
+    with django_assert_num_queries(4):
+        response = user_client.get(SUBSCRIPTIONS_URL, {'recipes_limit': 2})
+    assert response.status_code == 200
+    assert response.data['count'] == 3
+    for author in response.data['results']:
+        assert author['is_subscribed'] is True
+        assert author['recipes_count'] == 5
+        assert len(author['recipes']) == 2
+        assert set(author['recipes'][0]) == {
+            'id', 'name', 'image', 'image_srcset', 'cooking_time'
+        }
+
+
+@pytest.mark.django_db
+def test_subscriptions_latest_recipes_first(user_client, authors):
+    response = user_client.get(SUBSCRIPTIONS_URL, {'recipes_limit': 1})
+    latest = authors[0].recipes.order_by('-pub_date', '-id').first()
+    assert response.data['results'][0]['recipes'][0]['id'] == latest.id
+
+
+@pytest.mark.django_db
+def test_subscriptions_without_limit(user_client, authors):
+    response = user_client.get(SUBSCRIPTIONS_URL, {'limit': 2})
+    assert len(response.data['results']) == 2
+    assert len(response.data['results'][0]['recipes']) == 5
+
+
+@pytest.mark.django_db
+def test_subscribe_respects_recipes_limit(user_client, author, make_recipes):
+    make_recipes(author, 4)
+    response = user_client.post(
+        f'/api/users/{author.id}/subscribe/?recipes_limit=3'
+    )
+    assert response.status_code == 201
+    assert len(response.data['recipes']) == 3
+    assert response.data['recipes_count'] == 4
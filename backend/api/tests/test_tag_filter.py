@@ -0,0 +1,93 @@
+from io import StringIO
+
+import pytest
+from api import filters
+from django.core.management import call_command
+from recipes.models import Recipe, Tag
+from recipes.tag_masks import update_tags_masks
+
+RECIPES_URL = '/api/recipes/'
+
+
+def masks():
+    return dict(Recipe.objects.values_list('name', 'tags_mask'))
+
+
+@pytest.fixture
+def recipes(author, tags, make_recipes):
+    breakfast, lunch, dinner = tags
+    first, second, third = make_recipes(author, 3)
+    first.tags.set([breakfast, lunch])
+    second.tags.set([lunch])
+    third.tags.set([dinner])
+    return first, second, third
+
+
+@pytest.mark.django_db
+def test_tags_get_distinct_bits(tags):
+    assert sorted(tag.bit for tag in tags) == [0, 1, 2]
+    tags[1].delete()
+    assert Tag.objects.create(name='Перекус', slug='snack').bit == 1
+
+
+@pytest.mark.django_db
+def test_mask_follows_tag_changes(recipes, tags):
+    first, second, third = recipes
+    breakfast, lunch, dinner = tags
+    assert masks() == {first.name: 0b011, second.name: 0b010,
+                       third.name: 0b100}
+    second.tags.add(dinner)
+    third.tags.remove(dinner)
+    assert masks() == {first.name: 0b011, second.name: 0b110,
+                       third.name: 0}
+    lunch.recipes.clear()
+    assert masks() == {first.name: 0b001, second.name: 0b100,
+                       third.name: 0}
+    breakfast.recipes.add(third)
+    dinner.delete()
+    assert masks() == {first.name: 0b001, second.name: 0,
+                       third.name: 0b001}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('max_tags', [filters.MAX_MASKS_TAGS, 0])
+def test_filter_by_tags(monkeypatch, api_client, recipes, max_tags):
+    monkeypatch.setattr(filters, 'MAX_MASKS_TAGS', max_tags)
+    first, second, third = recipes
+
+    def names(*slugs):
+        response = api_client.get(RECIPES_URL, {'tags': slugs})
+        assert response.data['count'] == len(response.data['results'])
+        return sorted(recipe['name'] for recipe in response.data['results'])
+
+    assert names('lunch') == sorted([first.name, second.name])
+    assert names('breakfast', 'lunch') == sorted([first.name, second.name])
+    assert names('breakfast', 'dinner') == sorted([first.name, third.name])
+    assert names('breakfast', 'lunch', 'dinner') == sorted(masks())
+    assert api_client.get(
+        RECIPES_URL, {'tags': 'unknown'}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_filter_by_tag_without_bit(api_client, recipes, tags):
+    first, second, _ = recipes
+    # Тэг, созданный до появления битов: recount_counters ещё не запускали.
+    Tag.objects.filter(pk=tags[1].pk).update(bit=None)
+    update_tags_masks([recipe.id for recipe in recipes])
+    response = api_client.get(RECIPES_URL, {'tags': ['lunch', 'dinner']})
+    assert response.status_code == 200
+    assert {recipe['id'] for recipe in response.data['results']} == {
+        recipe.id for recipe in recipes
+    }
+    response = api_client.get(RECIPES_URL, {'tags': 'breakfast'})
+    assert [recipe['id'] for recipe in response.data['results']] == [
+        first.id
+    ]
+
+
+@pytest.mark.django_db
+def test_recount_restores_masks(recipes):
+    expected = masks()
+    Recipe.objects.update(tags_mask=0)
+    call_command('recount_counters', stdout=StringIO())
+    assert masks() == expected
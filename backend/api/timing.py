@@ -0,0 +1,100 @@
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+
+current_stats = ContextVar('current_stats', default=None)
+
+
+class RequestStats:
+    """
+    SQL-запросы и время сериализации одного запроса.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.serialize_time = 0.0
+        self.serializing = False
+        self.start = time.perf_counter()
+        self.total_time = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def db_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def slowest(self, count=5):
+        return sorted(
+            self.queries, key=lambda query: query[1], reverse=True
+        )[:count]
+
+    def duplicated(self):
+        """
+        Запросы, которые выполнялись больше одного раза: одинаковый
+        SQL с разными параметрами - обычно признак N+1.
+        """
+        counter = Counter(sql for sql, _ in self.queries)
+        return [(sql, count) for sql, count in counter.most_common()
+                if count > 1]
+
+
+@contextmanager
+def collect_stats():
+    """
+    Собирает RequestStats для кода внутри блока.
+    """
+    stats = RequestStats()
+    token = current_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield stats
+    finally:
+        stats.total_time = time.perf_counter() - stats.start
+        current_stats.reset(token)
+
+
+@contextmanager
+def serialization():
+    """
+    Время внутри блока учитывается как сериализация. Вложенные блоки
+    повторно не учитываются.
+    """
+    stats = current_stats.get()
+    if stats is None or stats.serializing:
+        yield
+        return
+    stats.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_time += time.perf_counter() - start
+        stats.serializing = False
+
+
+def timed_data(data):
+    """
+    Обёртка над BaseSerializer.data, засекающая время сериализации,
+    когда включён сбор статистики.
+    """
+    def wrapper(self):
+        with serialization():
+            return data.fget(self)
+    wrapper.timed = True
+    return property(wrapper)
+
+
+def install_serializer_timing():
+    if not getattr(BaseSerializer.data.fget, 'timed', False):
+        BaseSerializer.data = timed_data(BaseSerializer.data)
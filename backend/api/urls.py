@@ -1,9 +1,10 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import (DownloadShoppingCart, FavouriteView, FollowView,
-                    IngredientViewSet, RecipesViewSet, ShoppingListView,
-                    TagViewSet, showfollows)
+from .views import (BatchMembershipView, DownloadShoppingCart, FavouriteView,
+                    FollowView, IngredientViewSet, MetricsView, RecipesViewSet,
+                    ShoppingCartSummary, ShoppingListView, TagViewSet,
+                    showfollows)
 
 router = DefaultRouter()
 router.register('tags', TagViewSet, basename='tags')
@@ -13,13 +14,25 @@ router.register('ingredients', IngredientViewSet, basename='ingredients')
 urlpatterns = [
     path('users/subscriptions/',
          showfollows, name='users_subs'),
+    path('users/subscribe/',
+         BatchMembershipView.as_view(kind='follows'),
+         name='subscribe_batch'),
     path('users/<int:author_id>/subscribe/',
          FollowView.as_view(), name='subscribe'),
+    path('recipes/favorite/',
+         BatchMembershipView.as_view(kind='favorites'),
+         name='favorite_batch'),
     path('recipes/<int:recipe_id>/favorite/',
          FavouriteView.as_view(), name='add_recipe_to_favorite'),
+    path('recipes/shopping_cart/',
+         BatchMembershipView.as_view(kind='shopping_cart'),
+         name='shopping_cart_batch'),
     path('recipes/<int:recipe_id>/shopping_cart/',
          ShoppingListView.as_view(), name='add_recipe_to_shopping_cart'),
+    path('recipes/shopping_cart/summary/',
+         ShoppingCartSummary.as_view(), name='shopping_cart_summary'),
     path('recipes/download_shopping_cart/',
          DownloadShoppingCart.as_view(), name='dowload_shopping_cart'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', include(router.urls))
 ]
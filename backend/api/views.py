@@ -1,29 +1,42 @@
-from datetime import date
+from collections import defaultdict
 
 import django_filters.rest_framework
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from recipes.models import (CustomUser, Favorite, Ingredient,
-                            IngredientInRecipe, Recipe, ShoppingList, Tag)
-from rest_framework import filters, status, viewsets
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from recipes.models import CustomUser, Ingredient, Recipe, Tag
+from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from users.models import Follow
 
+from .batch import add_many, remove_many
 from .filters import RecipeFilter
-from .paginators import PageNumberPaginatorModified
+from .ingredient_index import ingredient_index
+from .links import add_recipe, remove_recipe
+from .metrics import get_store
+from .mixins import CatalogCacheMixin
+from .paginators import PageNumberPaginatorModified, RecipeCursorPagination
 from .permissions import AdminOrAuthorOrReadOnly
-from .serializers import (CreateRecipeSerializer, FavoriteSerializer,
+from .recipe_cards import recipe_rows, render_recipes
+from .renderers import (PrometheusRenderer, ShoppingCartCSVRenderer,
+                        ShoppingCartPDFRenderer, ShoppingCartTextRenderer)
+from .serializers import (BatchSerializer, CreateRecipeSerializer,
                           FollowSerializer, IngredientSerializer,
-                          ListRecipeSerializer, ShoppingListSerializer,
-                          ShowFollowersSerializer, TagSerializer)
+                          ListRecipeSerializer, ShowFollowersSerializer,
+                          ShowRecipeSerializer, TagSerializer)
+from .shopping_cart import (get_cart_ingredients, get_cart_size,
+                            get_cart_version)
+from .uploads import LimitedTemporaryFileUploadHandler
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
+    catalog = 'tags'
     pagination_class = None
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
@@ -37,6 +50,39 @@ class RecipesViewSet(viewsets.ModelViewSet):
     pagination_class = PageNumberPaginatorModified
     permission_classes = [AdminOrAuthorOrReadOnly, ]
 
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            LimitedTemporaryFileUploadHandler(request)
+        ]
+        return super().initialize_request(request, *args, **kwargs)
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if 'cursor' in self.request.query_params:
+                self._paginator = RecipeCursorPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def list(self, request, *args, **kwargs):
+        rows = recipe_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is None:
+            return Response(
+                render_recipes(rows, self.get_serializer_context())
+            )
+        return self.get_paginated_response(
+            render_recipes(page, self.get_serializer_context())
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        rows = recipe_rows(self.filter_queryset(self.get_queryset()))
+        row = get_object_or_404(rows, pk=kwargs[self.lookup_field])
+        return Response(
+            render_recipes([row], self.get_serializer_context())[0]
+        )
+
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return ListRecipeSerializer
@@ -48,24 +94,67 @@ class RecipesViewSet(viewsets.ModelViewSet):
         return context
 
 
-class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
+class IngredientViewSet(CatalogCacheMixin, viewsets.ReadOnlyModelViewSet):
+    catalog = 'ingredients'
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny, )
     pagination_class = None
-    filter_backends = [filters.SearchFilter]
-    search_fields = ['name', ]
+
+    def list(self, request, *args, **kwargs):
+        limit = request.query_params.get('limit')
+        limit = int(limit) if limit and limit.isdigit() else None
+        return Response(ingredient_index.search(
+            request.query_params.get('name', ''), limit
+        ))
+
+
+def get_recipes_limit(request):
+    limit = request.query_params.get('recipes_limit')
+    return int(limit) if limit and limit.isdigit() else None
+
+
+def attach_latest_recipes(authors, limit=None):
+    """
+    Раскладывает по авторам их последние рецепты одним запросом.
+
+    При заданном limit рецепты нумеруются оконной функцией внутри
+    каждого автора, и из базы приходят только первые limit штук.
+    """
+    recipes = Recipe.objects.filter(author__in=authors).only(
+        'id', 'author_id', 'name', 'image', 'image_variants_for',
+        'cooking_time', 'pub_date')
+    if limit is not None:
+        sql, params = recipes.annotate(row_number=Window(
+            expression=RowNumber(),
+            partition_by=[F('author_id')],
+            order_by=[F('pub_date').desc(), F('id').desc()],
+        )).query.sql_with_params()
+        recipes = Recipe.objects.raw(
+            f'SELECT * FROM ({sql}) AS latest '
+            f'WHERE row_number <= %s ORDER BY row_number',
+            (*params, limit)
+        )
+    by_author = defaultdict(list)
+    for recipe in recipes:
+        by_author[recipe.author_id].append(recipe)
+    for author in authors:
+        author.latest_recipes = by_author[author.id]
 
 
 @api_view(['GET', ])
 @permission_classes([IsAuthenticated])
 def showfollows(request):
-    user_obj = CustomUser.objects.filter(following__user=request.user)
-    paginator = PageNumberPagination()
+    user_obj = CustomUser.objects.filter(
+        following__user=request.user).order_by('id')
+    paginator = PageNumberPaginatorModified()
     paginator.page_size = 10
     result_page = paginator.paginate_queryset(user_obj, request)
+    recipes_limit = get_recipes_limit(request)
+    attach_latest_recipes(result_page, recipes_limit)
     serializer = ShowFollowersSerializer(
-        result_page, many=True, context={'current_user': request.user})
+        result_page, many=True,
+        context={'request': request, 'recipes_limit': recipes_limit})
     return paginator.get_paginated_response(serializer.data)
 
 
@@ -79,7 +168,11 @@ class FollowView(APIView):
             'user': user.id,
             'author': author_id
         }
-        serializer = FollowSerializer(data=data, context={'request': request})
+        context = {
+            'request': request,
+            'recipes_limit': get_recipes_limit(request)
+        }
+        serializer = FollowSerializer(data=data, context=context)
 
         if not serializer.is_valid():
             Response(
@@ -102,94 +195,107 @@ class FollowView(APIView):
         )
 
 
-class FavouriteView(APIView):
+class RecipeLinkView(APIView):
+    """
+    Добавление рецепта в избранное или корзину и удаление из них.
+
+    POST отвечает 201, если рецепт добавлен, и 200, если он уже был;
+    DELETE - 204. Несуществующий рецепт и отсутствующая связь - 404.
+    """
     permission_classes = (IsAuthenticated, )
+    kind = None
 
     def post(self, request, recipe_id):
-        user = request.user
-        data = {
-            'user': user.id,
-            'recipe': recipe_id,
-        }
-        serializer = FavoriteSerializer(
-            data=data,
-            context={'request': request}
+        created = add_recipe(request.user, self.kind, recipe_id)
+        recipe = get_object_or_404(Recipe.objects.only(
+            'id', 'name', 'image', 'image_variants_for', 'cooking_time'
+        ), pk=recipe_id)
+        return Response(
+            ShowRecipeSerializer(recipe, context={'request': request}).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
 
-        if not serializer.is_valid():
-            Response(
-                serializer.errors,
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        else:
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
     def delete(self, request, recipe_id):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        obj = get_object_or_404(Favorite, user=user, recipe=recipe)
-        obj.delete()
+        if not remove_recipe(request.user, self.kind, recipe_id):
+            raise Http404
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
-        return Response(
-            status=status.HTTP_204_NO_CONTENT
-        )
 
+class FavouriteView(RecipeLinkView):
+    kind = 'favorites'
 
-class ShoppingListView(APIView):
-    permission_classes = (IsAuthenticated, )
 
-    def post(self, request, recipe_id):
-        user = request.user
-        data = {
-            'user': user.id,
-            'recipe': recipe_id,
-        }
+class ShoppingListView(RecipeLinkView):
+    kind = 'shopping_cart'
 
-        context = {'request': request}
-        serializer = ShoppingListSerializer(data=data, context=context)
 
-        if not serializer.is_valid():
-            Response(
-                serializer.errors,
-                status=status.HTTP_400_BAD_REQUEST
-            )
+class BatchMembershipView(APIView):
+    """
+    Пакетное добавление и удаление: {"ids": [...]} для связи kind.
+    """
+    permission_classes = (IsAuthenticated, )
+    kind = None
 
-        else:
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def post(self, request):
+        return self.apply(request, add_many)
 
-    def delete(self, request, recipe_id):
-        user = request.user
-        recipe = get_object_or_404(Recipe, id=recipe_id)
-        obj = get_object_or_404(ShoppingList, user=user, recipe=recipe)
-        obj.delete()
+    def delete(self, request):
+        return self.apply(request, remove_many)
 
-        return Response(
-            status=status.HTTP_204_NO_CONTENT
+    def apply(self, request, action):
+        serializer = BatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = action(
+            request.user, self.kind, serializer.validated_data['ids']
         )
+        return Response({'results': [
+            {'id': obj_id, 'status': result}
+            for obj_id, result in results.items()
+        ]})
 
 
 class DownloadShoppingCart(APIView):
     permission_classes = (IsAuthenticated, )
+    renderer_classes = (ShoppingCartTextRenderer, ShoppingCartCSVRenderer,
+                        ShoppingCartPDFRenderer)
 
     def get(self, request):
-        user = request.user
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__customers__user=user).values(
-            'ingredient__name',
-            'ingredient__measurement_unit').annotate(total=Sum('amount'))
-        wishlist = '\n'.join([
-            f'{ingredient["ingredient__name"]} - {ingredient["total"]} '
-            f'{ingredient["ingredient__measurement_unit"]}'
-            for ingredient in ingredients
-        ])
-        today = date.today()
-        wishlist_basement = (f'\nFoodGram, {today.year}')
-        result = wishlist + wishlist_basement
-        filename = 'wishlist.txt'
-        response = HttpResponse(result, content_type='text/plain')
+        renderer = request.accepted_renderer
+        rows = get_cart_ingredients(request.user)
+        response = StreamingHttpResponse(
+            renderer.stream(rows), content_type=renderer.media_type
+        )
+        filename = f'wishlist.{renderer.format}'
         response['Content-Disposition'] = f'attachment; filename={filename}'
         return response
+
+
+class ShoppingCartSummary(APIView):
+    """
+    Итоги списка покупок в json. ETag - версия корзины, поэтому
+    повторный запрос без изменений получает 304 без обращения к базе.
+    """
+    permission_classes = (IsAuthenticated, )
+
+    def get(self, request):
+        user = request.user
+        etag = quote_etag(f'cart-{get_cart_version(user.id)}')
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response({
+                'recipes': get_cart_size(user),
+                'ingredients': [
+                    {'name': name, 'measurement_unit': unit, 'amount': amount}
+                    for name, unit, amount in get_cart_ingredients(user)
+                ],
+            })
+        response['ETag'] = etag
+        return response
+
+
+class MetricsView(APIView):
+    permission_classes = (IsAdminUser, )
+    renderer_classes = (PrometheusRenderer, )
+
+    def get(self, request):
+        return Response(get_store().export())
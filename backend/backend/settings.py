@@ -50,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,6 +59,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -96,6 +99,31 @@ DATABASES = {
     }
 }
 
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND',
+    default='django.core.cache.backends.filebased.FileBasedCache'
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION', default=os.path.join(BASE_DIR, 'cache')
+        ),
+    }
+}
+
+# У файлового и локального кеша по умолчанию 300 записей: при вытеснении
+# теряются и бессрочные ключи версий. Файловый кеш при каждой записи
+# перечисляет каталог, так что цена записи растёт с числом ключей; при
+# большой нагрузке лучше задать CACHE_BACKEND с memcached.
+if CACHE_BACKEND.endswith(('FileBasedCache', 'LocMemCache')):
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(
+            os.getenv('CACHE_MAX_ENTRIES', default=100000)
+        ),
+    }
+
 AUTH_USER_MODEL = 'users.CustomUser'
 
 # Password validation
@@ -182,3 +210,46 @@ DJOSER = {
 MIN_COOKING_TIME = 1
 
 MIN_INGREDIENT_AMOUNT = 1
+
+SHOPPING_CART_CACHE_TIMEOUT = 60 * 60 * 24
+
+MEMBERSHIP_CACHE_TIMEOUT = 60 * 60
+
+BATCH_MAX_IDS = 100
+
+RECIPE_IMAGE_WIDTHS = (300, 600, 1200)
+
+RECIPE_IMAGE_QUALITY = 80
+
+RECIPE_IMAGE_WORKERS = 2
+
+RECIPE_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+
+RECIPE_IMAGE_MAX_SIDE = 8000
+
+RECIPE_IMAGE_MAX_PIXELS = 40_000_000
+
+SHOPPING_CART_PDF_FONT = os.getenv(
+    'SHOPPING_CART_PDF_FONT',
+    default='/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
+)
+
+SERVER_TIMING_ENABLED = os.getenv(
+    'SERVER_TIMING_ENABLED', default='False'
+).lower() in ('1', 'true', 'yes')
+
+SLOW_REQUEST_THRESHOLD = int(os.getenv('SLOW_REQUEST_THRESHOLD', default=500))
+
+METRICS_ENABLED = os.getenv(
+    'METRICS_ENABLED', default='True'
+).lower() in ('1', 'true', 'yes')
+
+METRICS_STORE = os.getenv(
+    'METRICS_STORE', default=os.path.join(BASE_DIR, 'metrics.sqlite3')
+)
+
+METRICS_FLUSH_INTERVAL = 5
+
+PROFILE_TOP_N = 40
+
+PROFILE_KEEP = 200
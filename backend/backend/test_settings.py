@@ -0,0 +1,22 @@
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+# Без явно заданного DB_ENGINE тесты гоняются на sqlite в памяти,
+# чтобы их можно было запустить без контейнера с postgres.
+if 'DB_ENGINE' not in os.environ:
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+METRICS_ENABLED = False
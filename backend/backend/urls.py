@@ -15,9 +15,11 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import include, path
+from recipes.views import recipe_image
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('media/recipes/<path:path>', recipe_image, name='recipe_image'),
     path('api/', include('api.urls')),
     path('api/', include('users.urls'))
 ]
@@ -0,0 +1,153 @@
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIClient
+
+from .dataset import seed
+
+BUDGETS_PATH = Path(__file__).with_name('budgets.json')
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark', 'замеры эндпоинтов')
+    group.addoption(
+        '--benchmark-json', default='benchmark-results.json',
+        help='Куда записать результаты замеров.'
+    )
+    group.addoption(
+        '--benchmark-budgets', default=str(BUDGETS_PATH),
+        help='json с бюджетами запросов и времени; пустая строка - без '
+             'бюджетов.'
+    )
+    group.addoption(
+        '--benchmark-compare',
+        help='Результаты прошлого запуска для сравнения.'
+    )
+    group.addoption('--benchmark-rounds', type=int, default=10)
+    group.addoption(
+        '--benchmark-scale', type=int, default=1,
+        help='Множитель размера набора данных.'
+    )
+
+
+def pytest_configure(config):
+    config.benchmark_results = {}
+
+
+@pytest.fixture(scope='session')
+def dataset(request, django_db_setup, django_db_blocker, tmp_path_factory):
+    # Фото-заглушка seed пишется во временный каталог, а не в media.
+    media_root = str(tmp_path_factory.mktemp('media'))
+    with django_db_blocker.unblock(), override_settings(MEDIA_ROOT=media_root):
+        return seed(request.config.getoption('benchmark_scale'))
+
+
+@pytest.fixture(scope='session')
+def budgets(request):
+    path = request.config.getoption('benchmark_budgets')
+    if not path:
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user_client(dataset):
+    client = APIClient()
+    client.force_authenticate(dataset['user'])
+    return client
+
+
+@pytest.fixture
+def bench(request, budgets):
+    """
+    Вызывает action сначала с пустым кешем, затем --benchmark-rounds
+    раз подряд; запоминает время и число SQL-запросов и сверяет их
+    с бюджетом эндпоинта.
+    """
+    config = request.config
+
+    def run(name, action):
+        cache.clear()
+        with CaptureQueriesContext(connection) as cold_queries:
+            start = time.perf_counter()
+            action()
+            cold = time.perf_counter() - start
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(config.getoption('benchmark_rounds')):
+                start = time.perf_counter()
+                action()
+                timings.append(time.perf_counter() - start)
+        result = {
+            'cold_queries': len(cold_queries),
+            'queries': len(queries) / len(timings),
+            'cold_ms': round(cold * 1000, 3),
+            'median_ms': round(statistics.median(timings) * 1000, 3),
+            'min_ms': round(min(timings) * 1000, 3),
+            'max_ms': round(max(timings) * 1000, 3),
+            'rounds': len(timings),
+        }
+        config.benchmark_results[name] = result
+        budget = budgets.get(name, {})
+        exceeded = [
+            f'{key}: {result[key]} > {limit}'
+            for key, limit in budget.items() if result[key] > limit
+        ]
+        assert not exceeded, f'{name} вышел за бюджет: {", ".join(exceeded)}'
+        return result
+    return run
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.benchmark_results:
+        return
+    data = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'rounds': config.getoption('benchmark_rounds'),
+            'scale': config.getoption('benchmark_scale'),
+        },
+        'results': config.benchmark_results,
+    }
+    with open(config.getoption('benchmark_json'), 'w',
+              encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    results = config.benchmark_results
+    if not results:
+        return
+    previous = {}
+    compare = config.getoption('benchmark_compare')
+    if compare:
+        with open(compare, encoding='utf-8') as file:
+            previous = json.load(file)['results']
+    write = terminalreporter.write_line
+    terminalreporter.section('benchmarks')
+    write(f'{"эндпоинт":<32}{"запросы":>9}{"холодный":>11}'
+          f'{"медиана":>11}{"изменение":>12}')
+    for name, result in sorted(results.items()):
+        change = ''
+        if name in previous and previous[name]['median_ms']:
+            ratio = result['median_ms'] / previous[name]['median_ms'] - 1
+            change = f'{ratio:+.1%}'
+        write(f'{name:<32}{result["queries"]:>9g}{result["cold_ms"]:>11.2f}'
+              f'{result["median_ms"]:>11.2f}{change:>12}')
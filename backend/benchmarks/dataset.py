@@ -0,0 +1,57 @@
+import random
+from io import StringIO
+
+from django.core.management import call_command
+from recipes.models import Favorite, Ingredient, Recipe, ShoppingList, Tag
+from users.models import CustomUser, Follow
+
+PASSWORD = 'pass12345'
+
+
+def seed(scale=1, seed_value=0):
+    """
+    Заполняет базу данными для замеров командой seed и добавляет
+    пользователя bench с подписками, избранным и корзиной.
+    Возвращает словарь с объектами, нужными бенчмаркам.
+    """
+    call_command(
+        'seed', users=50 * scale, recipes=1000 * scale, follows=0,
+        favorites=0, cart=0, seed=seed_value, prefix='author',
+        stdout=StringIO()
+    )
+    rnd = random.Random(seed_value)
+    author_ids = sorted(set(Recipe.objects.values_list(
+        'author_id', flat=True)))
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    user = CustomUser.objects.create_user(
+        email='bench@foodgram.ru', username='bench',
+        first_name='Бенч', last_name='Марк', password=PASSWORD
+    )
+    followed = set(rnd.sample(author_ids, min(20, len(author_ids) - 1)))
+    Follow.objects.bulk_create([
+        Follow(user=user, author_id=author_id) for author_id in followed
+    ])
+    favorites = set(rnd.sample(recipe_ids, 100))
+    Favorite.objects.bulk_create([
+        Favorite(user=user, recipe_id=recipe_id) for recipe_id in favorites
+    ])
+    cart = set(rnd.sample(recipe_ids, 10))
+    ShoppingList.objects.bulk_create([
+        ShoppingList(user=user, recipe_id=recipe_id) for recipe_id in cart
+    ])
+    # Связи bench вставлены в обход сигналов.
+    call_command('recount_counters', stdout=StringIO())
+    return {
+        'user': user,
+        # Автор и рецепт, которых нет в подписках, избранном и корзине.
+        'author_id': min(set(author_ids) - followed),
+        'recipe_id': min(set(recipe_ids) - favorites - cart),
+        # Неделя рецептов для пакетного добавления в корзину.
+        'meal_plan': sorted(set(recipe_ids) - favorites - cart)[:12],
+        'tags': list(Tag.objects.order_by('pk')),
+        'counts': {
+            'users': CustomUser.objects.count(),
+            'recipes': len(recipe_ids),
+            'ingredients': Ingredient.objects.count(),
+        },
+    }
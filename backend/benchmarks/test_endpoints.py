@@ -0,0 +1,123 @@
+import pytest
+
+pytestmark = pytest.mark.django_db
+
+RECIPES_URL = '/api/recipes/'
+
+
+def get(client, url, params=None):
+    def action():
+        response = client.get(url, params)
+        assert response.status_code == 200, response.status_code
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return action
+
+
+def toggle(client, url):
+    def action():
+        assert client.post(url).status_code == 201
+        assert client.delete(url).status_code == 204
+    return action
+
+
+@pytest.mark.parametrize('name, params', [
+    ('recipes-list', {'limit': 6}),
+    ('recipes-list-50', {'limit': 50}),
+    ('recipes-list-tags', {'limit': 6, 'tags': ['breakfast', 'lunch']}),
+    ('recipes-list-cursor', {'limit': 6, 'cursor': ''}),
+    ('recipes-search', {'limit': 6, 'search': 'ингредиент 42'}),
+])
+def test_recipes_list_anonymous(bench, api_client, dataset, name, params):
+    bench(name, get(api_client, RECIPES_URL, params))
+
+
+@pytest.mark.parametrize('name, params', [
+    ('recipes-list-auth', {'limit': 6}),
+    ('recipes-list-favorited', {'limit': 6, 'is_favorited': 1}),
+    ('recipes-list-in-cart', {'limit': 6, 'is_in_shopping_cart': 1}),
+])
+def test_recipes_list_authenticated(bench, user_client, name, params):
+    bench(name, get(user_client, RECIPES_URL, params))
+
+
+def test_recipes_list_by_author(bench, api_client, dataset):
+    bench('recipes-list-author', get(
+        api_client, RECIPES_URL, {'limit': 6, 'author': dataset['author_id']}
+    ))
+
+
+def test_recipe_detail(bench, user_client, dataset):
+    bench('recipes-detail', get(
+        user_client, f'{RECIPES_URL}{dataset["recipe_id"]}/'
+    ))
+
+
+def test_subscriptions(bench, user_client):
+    bench('subscriptions', get(
+        user_client, '/api/users/subscriptions/', {'recipes_limit': 3}
+    ))
+
+
+def test_subscribe_toggle(bench, user_client, dataset):
+    bench('subscribe-toggle', toggle(
+        user_client, f'/api/users/{dataset["author_id"]}/subscribe/'
+    ))
+
+
+def test_favorite_toggle(bench, user_client, dataset):
+    bench('favorite-toggle', toggle(
+        user_client, f'{RECIPES_URL}{dataset["recipe_id"]}/favorite/'
+    ))
+
+
+def test_shopping_cart_toggle(bench, user_client, dataset):
+    bench('shopping-cart-toggle', toggle(
+        user_client, f'{RECIPES_URL}{dataset["recipe_id"]}/shopping_cart/'
+    ))
+
+
+def test_shopping_cart_batch(bench, user_client, dataset):
+    url = f'{RECIPES_URL}shopping_cart/'
+    data = {'ids': dataset['meal_plan']}
+
+    def action():
+        assert user_client.post(url, data, format='json').status_code == 200
+        assert user_client.delete(
+            url, data, format='json').status_code == 200
+    bench('shopping-cart-batch', action)
+
+
+def test_shopping_cart_summary(bench, user_client):
+    bench('shopping-cart-summary', get(
+        user_client, f'{RECIPES_URL}shopping_cart/summary/'
+    ))
+
+
+@pytest.mark.parametrize('file_format', ['txt', 'csv', 'pdf'])
+def test_download_shopping_cart(bench, user_client, file_format):
+    bench(f'shopping-cart-download-{file_format}', get(
+        user_client, f'{RECIPES_URL}download_shopping_cart/',
+        {'format': file_format}
+    ))
+
+
+@pytest.mark.parametrize('name, params', [
+    ('ingredients-list', None),
+    ('ingredients-search', {'name': 'ингредиент 1'}),
+    ('ingredients-search-substring', {'name': '99', 'limit': 10}),
+])
+def test_ingredients(bench, api_client, dataset, name, params):
+    bench(name, get(api_client, '/api/ingredients/', params))
+
+
+def test_tags(bench, api_client, dataset):
+    bench('tags-list', get(api_client, '/api/tags/'))
+
+
+def test_users_list(bench, user_client):
+    bench('users-list', get(user_client, '/api/users/', {'limit': 6}))
+
+
+def test_users_me(bench, user_client):
+    bench('users-me', get(user_client, '/api/users/me/'))
@@ -1,8 +1,13 @@
+from collections import defaultdict
+
+from api.shopping_cart import bump_recipe_carts
 from django.contrib import admin
+from django.db import transaction
 from users.models import Follow
 
-from .models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
-                     ShoppingList, Tag)
+from .cart_totals import apply_recipe_changes
+from .models import (Favorite, ImageBlob, Ingredient, IngredientInRecipe,
+                     Recipe, ShoppingList, Tag)
 
 
 class RecipeAdmin(admin.ModelAdmin):
@@ -10,8 +15,14 @@ class RecipeAdmin(admin.ModelAdmin):
     list_display = ('name', 'author', 'followers', 'id')
 
     def followers(self, obj):
-        return obj.favorite_recipes.all().count()
+        return obj.favorites_count
     followers.short_description = 'В избранном'
+    followers.admin_order_field = 'favorites_count'
+
+
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'references', 'updated')
+    readonly_fields = ('name', 'references', 'updated')
 
 
 class IngredientAdmin(admin.ModelAdmin):
@@ -19,10 +30,54 @@ class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
 
 
+def apply_item_changes(changes):
+    """
+    Переносит в итоги списков покупок правку строк ингредиентов:
+    changes - пары (строка, 1 для добавленной или -1 для удалённой).
+    """
+    deltas = defaultdict(dict)
+    for item, sign in changes:
+        amount, recipes = deltas[item.recipe_id].get(
+            item.ingredient_id, (0, 0)
+        )
+        deltas[item.recipe_id][item.ingredient_id] = (
+            amount + sign * (item.amount or 0), recipes + sign
+        )
+    for recipe_id, recipe_deltas in deltas.items():
+        apply_recipe_changes(recipe_id, recipe_deltas)
+    transaction.on_commit(
+        lambda: [bump_recipe_carts(recipe_id) for recipe_id in deltas]
+    )
+
+
+class IngredientInRecipeAdmin(admin.ModelAdmin):
+    """
+    Правка мимо API: итоги списков покупок обновляются здесь же.
+    """
+    list_display = ('recipe', 'ingredient', 'amount')
+
+    def save_model(self, request, obj, form, change):
+        changes = [(obj, 1)]
+        if change:
+            changes.append((IngredientInRecipe.objects.get(pk=obj.pk), -1))
+        super().save_model(request, obj, form, change)
+        apply_item_changes(changes)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        apply_item_changes([(obj, -1)])
+
+    def delete_queryset(self, request, queryset):
+        items = list(queryset)
+        super().delete_queryset(request, queryset)
+        apply_item_changes([(item, -1) for item in items])
+
+
 admin.site.register(Follow)
 admin.site.register(Tag)
 admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(Favorite)
 admin.site.register(ShoppingList)
-admin.site.register(IngredientInRecipe)
+admin.site.register(IngredientInRecipe, IngredientInRecipeAdmin)
+admin.site.register(ImageBlob, ImageBlobAdmin)
@@ -0,0 +1,91 @@
+from django.db import connection
+
+from .models import CartTotal, IngredientInRecipe, ShoppingList
+
+# Прибавляет строки (user_id, ingredient_id, amount, recipes) к итогам,
+# создавая недостающие. Вычитание - те же строки с минусом.
+INSERT = 'INSERT INTO {totals} (user_id, ingredient_id, amount, recipes) '
+UPSERT = (
+    INSERT + '{rows} ON CONFLICT (user_id, ingredient_id) DO UPDATE SET '
+    'amount = {totals}.amount + excluded.amount, '
+    'recipes = {totals}.recipes + excluded.recipes'
+)
+CART_ROWS = (
+    'SELECT %s, ingredient_id, %s * SUM(COALESCE(amount, 0)), %s * COUNT(*) '
+    'FROM {items} WHERE recipe_id IN ({recipe_ids}) GROUP BY ingredient_id'
+)
+RECIPE_ROWS = (
+    'SELECT cart.user_id, delta.ingredient_id, delta.amount, delta.recipes '
+    'FROM {carts} AS cart, ({deltas}) AS delta WHERE cart.recipe_id = %s'
+)
+ALL_ROWS = (
+    'SELECT cart.user_id, item.ingredient_id, '
+    'SUM(COALESCE(item.amount, 0)), COUNT(*) '
+    'FROM {carts} AS cart JOIN {items} AS item '
+    'ON item.recipe_id = cart.recipe_id '
+    'GROUP BY cart.user_id, item.ingredient_id'
+)
+
+
+def tables():
+    quote = connection.ops.quote_name
+    return {
+        'totals': quote(CartTotal._meta.db_table),
+        'items': quote(IngredientInRecipe._meta.db_table),
+        'carts': quote(ShoppingList._meta.db_table),
+    }
+
+
+def execute(sql, rows, params=()):
+    names = tables()
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(rows=rows.format(**names), **names), params)
+
+
+def change_cart_totals(user_id, recipe_ids, sign):
+    """
+    Прибавляет (sign=1) или вычитает (sign=-1) ингредиенты рецептов
+    recipe_ids из итогов списка покупок пользователя.
+    """
+    recipe_ids = list(recipe_ids)
+    if not recipe_ids:
+        return
+    execute(
+        UPSERT, CART_ROWS.replace(
+            '{recipe_ids}', ', '.join(['%s'] * len(recipe_ids))
+        ),
+        (user_id, sign, sign, *recipe_ids)
+    )
+    if sign < 0:
+        CartTotal.objects.filter(user_id=user_id, recipes__lte=0).delete()
+
+
+def apply_recipe_changes(recipe_id, deltas):
+    """
+    Переносит изменения ингредиентов рецепта в итоги всех, у кого он
+    в корзине. deltas: {ingredient_id: (изменение количества,
+    изменение числа рецептов)}.
+    """
+    if not deltas:
+        return
+    selects = ['SELECT %s AS ingredient_id, %s AS amount, %s AS recipes']
+    selects += ['SELECT %s, %s, %s'] * (len(deltas) - 1)
+    params = [
+        value for ingredient_id, (amount, recipes) in deltas.items()
+        for value in (ingredient_id, amount, recipes)
+    ]
+    execute(
+        UPSERT, RECIPE_ROWS.replace('{deltas}', ' UNION ALL '.join(selects)),
+        (*params, recipe_id)
+    )
+    CartTotal.objects.filter(
+        ingredient_id__in=deltas, recipes__lte=0).delete()
+
+
+def rebuild_cart_totals():
+    """
+    Пересчитывает итоги всех списков покупок, возвращает число строк.
+    """
+    CartTotal.objects.all().delete()
+    execute(INSERT + '{rows}', ALL_ROWS)
+    return CartTotal.objects.count()
@@ -0,0 +1,23 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+
+def change_counter(model, pk, field, delta):
+    """
+    Сдвигает счётчик на delta. Разошедшийся с данными счётчик не уходит
+    ниже нуля: иначе PositiveIntegerField нарушит CHECK и запрос упадёт.
+    """
+    model.objects.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+def count_by(queryset, field):
+    """
+    Подзапрос с количеством строк queryset для OuterRef('pk').
+    """
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(
+            field).annotate(total=Count('pk')).values('total'),
+        output_field=IntegerField()
+    ), 0)
@@ -0,0 +1,114 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from PIL import Image
+
+from .models import Recipe
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.RECIPE_IMAGE_WORKERS,
+        thread_name_prefix='recipe-images'
+    )
+
+
+def variant_name(image_name, width, image_format):
+    """
+    Имя файла уменьшенной копии: recipes/variants/<имя>_<ширина>.<ext>.
+    """
+    directory, filename = os.path.split(image_name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(
+        directory, 'variants', f'{stem}_{width}.{FORMATS[image_format]}'
+    )
+
+
+def generate_variants(recipe_id, image_name):
+    """
+    Сохраняет копии фото рецепта в jpeg и webp для каждой ширины из
+    RECIPE_IMAGE_WIDTHS и помечает рецепт, если фото за это время
+    не поменялось.
+    """
+    try:
+        # То же фото уже обработано для другого рецепта.
+        if Recipe.objects.filter(image_variants_for=image_name).exists():
+            Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+                image_variants_for=image_name
+            )
+            return
+        with default_storage.open(image_name) as file:
+            image = Image.open(file)
+            image.load()
+        image = image.convert('RGB')
+        for width in settings.RECIPE_IMAGE_WIDTHS:
+            resized = image.copy()
+            resized.thumbnail((width, width * 10), Image.LANCZOS)
+            for image_format in FORMATS:
+                buffer = BytesIO()
+                resized.save(
+                    buffer, image_format.upper(),
+                    quality=settings.RECIPE_IMAGE_QUALITY
+                )
+                name = variant_name(image_name, width, image_format)
+                if default_storage.exists(name):
+                    default_storage.delete(name)
+                default_storage.save(name, ContentFile(buffer.getvalue()))
+        Recipe.objects.filter(pk=recipe_id, image=image_name).update(
+            image_variants_for=image_name
+        )
+    except Exception:
+        logger.exception('Не удалось подготовить превью %s', image_name)
+
+
+def generate_variants_job(recipe_id, image_name):
+    try:
+        generate_variants(recipe_id, image_name)
+    finally:
+        # Соединение с базой у каждого потока пула своё.
+        connection.close()
+
+
+def schedule_variants(recipe):
+    get_executor().submit(
+        generate_variants_job, recipe.id, recipe.image.name
+    )
+
+
+def get_srcset(recipe, request=None):
+    """
+    srcset для каждого формата. Пока превью не готовы,
+    в нём только исходное фото.
+    """
+    if not recipe.image:
+        return None
+    return build_srcset(recipe.image.name, recipe.image_variants_for, request)
+
+
+def build_srcset(image_name, variants_for, request=None):
+    def url(name):
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+    if variants_for != image_name:
+        original = url(image_name)
+        return {image_format: original for image_format in FORMATS}
+    return {
+        image_format: ', '.join(
+            f'{url(variant_name(image_name, width, image_format))} '
+            f'{width}w'
+            for width in settings.RECIPE_IMAGE_WIDTHS
+        ) for image_format in FORMATS
+    }
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from recipes.images import FORMATS, variant_name
+from recipes.models import ImageBlob, Recipe
+from recipes.storage import recipe_image_storage
+
+
+class Command(BaseCommand):
+    help = '''Удаление файлов фото, на которые не ссылается ни один
+    рецепт.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=60,
+            help='Не трогать файлы, изменённые меньше N минут назад.'
+        )
+        parser.add_argument(
+            '--recount', action='store_true',
+            help='Сначала пересчитать ссылки по таблице рецептов.'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            self.recount()
+        threshold = timezone.now() - timedelta(minutes=options['min_age'])
+        orphans = ImageBlob.objects.filter(
+            references__lte=0, updated__lt=threshold
+        )
+        names = set(orphans.values_list('name', flat=True))
+        # Защита от рассинхронизации счётчиков.
+        names -= set(Recipe.objects.filter(
+            image__in=names).values_list('image', flat=True))
+        for name in sorted(names):
+            self.stdout.write(f'Удаляется {name}')
+            if options['dry_run']:
+                continue
+            recipe_image_storage.delete(name)
+            for width in settings.RECIPE_IMAGE_WIDTHS:
+                for image_format in FORMATS:
+                    default_storage.delete(
+                        variant_name(name, width, image_format)
+                    )
+        if not options['dry_run']:
+            ImageBlob.objects.filter(name__in=names).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено файлов: {0 if options["dry_run"] else len(names)}'
+        ))
+
+    def recount(self):
+        for name in Recipe.objects.exclude(image='').exclude(
+                image__in=ImageBlob.objects.values('name')).values_list(
+                'image', flat=True).distinct():
+            ImageBlob.objects.get_or_create(name=name)
+        ImageBlob.objects.update(references=Coalesce(Subquery(
+            Recipe.objects.filter(image=OuterRef('name')).order_by().values(
+                'image').annotate(total=Count('pk')).values('total')
+        ), 0))
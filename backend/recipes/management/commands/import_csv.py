@@ -1,18 +1,128 @@
 import csv
+import json
+import os
+import re
 
-from django.core.management.base import BaseCommand
+from api.catalog import bump_catalog_version
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 from recipes.models import Ingredient
 
+FORMATS = ('csv', 'json')
+CHUNK_SIZE = 64 * 1024
+SEPARATORS = re.compile(r'[\s\[\],]*')
+
+
+def read_csv(file):
+    for row in csv.reader(file):
+        if len(row) != 2:
+            yield None
+            continue
+        yield row
+
+
+def read_json(file):
+    """
+    Потоково читает json-массив вида
+    [{"name": ..., "measurement_unit": ...}, ...], не загружая файл
+    в память целиком.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    while True:
+        match = SEPARATORS.match(buffer, position)
+        position = match.end()
+        separators = match.group()
+        if not started and separators.strip():
+            started = True
+        if started and ']' in separators:
+            return
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            chunk = file.read(CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный json')
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if not started:
+            raise CommandError('Ожидается json-массив ингредиентов')
+        if not isinstance(item, dict):
+            yield None
+            continue
+        yield item.get('name'), item.get('measurement_unit')
+
+
+READERS = {'csv': read_csv, 'json': read_json}
+
 
 class Command(BaseCommand):
-    help = '''Загрузка базы данных из csv-файла.'''
+    help = '''Загрузка ингредиентов из csv- или json-файлов.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', default=['./data/ingredients.csv'],
+            help='Файлы с ингредиентами.'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файлов; по умолчанию берётся из расширения.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество ингредиентов в одном INSERT.'
+        )
+
+    def get_format(self, path, options):
+        file_format = options['format']
+        if file_format is None:
+            file_format = os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in FORMATS:
+            raise CommandError(f'Неизвестный формат файла: {path}')
+        return file_format
 
     def handle(self, *args, **options):
-        with open('./data/ingredients.csv', encoding='utf-8') as file:
-            file_reader = csv.reader(file)
-            for row in file_reader:
-                name, measurement_unit = row
-                Ingredient.objects.get_or_create(
-                    name=name,
-                    measurement_unit=measurement_unit
-                )
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        seen = set(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+        total = 0
+        batch = []
+        with transaction.atomic():
+            before = Ingredient.objects.count()
+            for path in options['paths']:
+                reader = READERS[self.get_format(path, options)]
+                with open(path, encoding='utf-8') as file:
+                    for row in reader(file):
+                        total += 1
+                        if row is None or not all(row):
+                            continue
+                        key = tuple(str(value).strip() for value in row)
+                        if key in seen:
+                            continue
+                        seen.add(key)
+                        batch.append(Ingredient(
+                            name=key[0], measurement_unit=key[1]
+                        ))
+                        if len(batch) >= batch_size:
+                            self.flush(batch, total)
+                self.stdout.write(f'{path}: обработано строк - {total}')
+            self.flush(batch, total)
+            inserted = Ingredient.objects.count() - before
+        if inserted:
+            bump_catalog_version('ingredients')
+        self.stdout.write(self.style.SUCCESS(
+            f'Добавлено: {inserted}, пропущено: {total - inserted}'
+        ))
+
+    def flush(self, batch, total):
+        if not batch:
+            return
+        Ingredient.objects.bulk_create(batch, ignore_conflicts=True)
+        self.stdout.write(f'Обработано строк: {total}')
+        batch.clear()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = '''Перестроение поискового индекса рецептов.'''
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        recipes = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано рецептов: {recipes}'
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from recipes.cart_totals import rebuild_cart_totals
+from recipes.counters import count_by
+from recipes.models import Favorite, Recipe, ShoppingList, Tag
+from recipes.tag_masks import tags_mask_expression
+from users.models import CustomUser, Follow
+
+
+class Command(BaseCommand):
+    help = '''Пересчёт счётчиков избранного, покупок, рецептов
+    и подписчиков, масок тэгов рецептов и итогов списков покупок.'''
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        for tag in Tag.objects.filter(bit=None):
+            tag.save()
+        recipes = Recipe.objects.update(
+            favorites_count=count_by(Favorite.objects, 'recipe'),
+            in_carts_count=count_by(ShoppingList.objects, 'recipe'),
+            tags_mask=tags_mask_expression(),
+        )
+        users = CustomUser.objects.update(
+            recipes_count=count_by(Recipe.objects, 'author'),
+            followers_count=count_by(Follow.objects, 'author'),
+        )
+        totals = rebuild_cart_totals()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано рецептов: {recipes}, пользователей: {users}, '
+            f'итогов списков покупок: {totals}'
+        ))
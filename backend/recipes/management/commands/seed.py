@@ -0,0 +1,270 @@
+import random
+from io import BytesIO
+from itertools import accumulate, islice
+
+from api.catalog import bump_catalog_version
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from PIL import Image
+from recipes.models import (Favorite, Ingredient, IngredientInRecipe, Recipe,
+                            ShoppingList, Tag)
+from recipes.signals import change_image_references
+from recipes.storage import recipe_image_storage
+from users.models import CustomUser, Follow
+
+TAGS = (
+    ('Завтрак', '#E26C2D', 'breakfast'),
+    ('Обед', '#49B64E', 'lunch'),
+    ('Ужин', '#8775D2', 'dinner'),
+)
+FIRST_NAMES = ('Иван', 'Мария', 'Пётр', 'Анна', 'Сергей', 'Ольга')
+LAST_NAMES = ('Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Соколов')
+DISHES = ('Суп', 'Салат', 'Пирог', 'Рагу', 'Каша', 'Запеканка', 'Паста')
+
+
+def zipf_weights(size, exponent=1.0):
+    """
+    Накопленные веса закона Ципфа: первые элементы встречаются
+    намного чаще остальных, как популярные авторы и ингредиенты.
+    """
+    return list(accumulate(
+        1 / rank ** exponent for rank in range(1, size + 1)
+    ))
+
+
+def weighted_sample(rnd, population, cum_weights, k):
+    """
+    k различных элементов population с учётом весов.
+    """
+    k = min(k, len(population))
+    if k * 2 > len(population):
+        return sorted(rnd.sample(population, k))
+    result = set()
+    while len(result) < k:
+        result.update(rnd.choices(
+            population, cum_weights=cum_weights, k=k - len(result)
+        ))
+    return sorted(result)
+
+
+def last_pk(model):
+    return model.objects.aggregate(pk=Max('pk'))['pk'] or 0
+
+
+def pks_after(model, pk):
+    return list(model.objects.filter(pk__gt=pk).order_by('pk').values_list(
+        'pk', flat=True))
+
+
+class Command(BaseCommand):
+    help = '''Генерация пользователей, рецептов, подписок, избранного
+    и корзин для нагрузочного тестирования.'''
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--recipes', type=int, default=10000)
+        parser.add_argument(
+            '--ingredients-per-recipe', type=int, default=8,
+            help='Среднее количество ингредиентов в рецепте.'
+        )
+        parser.add_argument(
+            '--follows', type=int, default=10,
+            help='Среднее количество подписок пользователя.'
+        )
+        parser.add_argument(
+            '--favorites', type=int, default=20,
+            help='Среднее количество рецептов в избранном.'
+        )
+        parser.add_argument(
+            '--cart', type=int, default=3,
+            help='Среднее количество рецептов в корзине.'
+        )
+        parser.add_argument(
+            '--images', type=int, default=1,
+            help='Количество разных фото-заглушек; 0 - без фото.'
+        )
+        parser.add_argument(
+            '--password',
+            help='Пароль пользователей; по умолчанию войти под ними нельзя.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Префикс логинов и email создаваемых пользователей.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля')
+        prefix = options['prefix']
+        if CustomUser.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(
+                f'Пользователи с префиксом {prefix} уже есть, '
+                f'укажите другой --prefix'
+            )
+        self.rnd = random.Random(options['seed'])
+        self.verbosity = options['verbosity']
+        self.batch_size = options['batch_size']
+        tag_ids = self.get_tags()
+        ingredient_ids = self.get_ingredients()
+        images = self.make_images(options['images'])
+
+        user_ids = self.create_users(
+            options['users'], prefix, options['password']
+        )
+        recipe_ids = self.create_recipes(
+            options['recipes'], user_ids, images
+        )
+        self.create_recipe_relations(
+            recipe_ids, tag_ids, ingredient_ids,
+            options['ingredients_per_recipe']
+        )
+        self.create_user_relations(user_ids, recipe_ids, options)
+        call_command('recount_counters', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('Готово'))
+
+    def insert(self, label, model, objects):
+        """
+        Вставляет объекты пачками по --batch-size, каждую в своей
+        транзакции.
+        """
+        objects = iter(objects)
+        total = 0
+        while True:
+            batch = list(islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            total += len(batch)
+            if self.verbosity > 1:
+                self.stdout.write(f'{label}: {total}')
+        self.stdout.write(f'{label}: {total}')
+
+    def get_tags(self):
+        if not Tag.objects.exists():
+            Tag.objects.bulk_create([
+                Tag(name=name, color=color, slug=slug, bit=bit)
+                for bit, (name, color, slug) in enumerate(TAGS)
+            ])
+            bump_catalog_version('tags')
+        return list(Tag.objects.order_by('pk').values_list('pk', flat=True))
+
+    def get_ingredients(self):
+        if not Ingredient.objects.exists():
+            self.insert('Ингредиенты', Ingredient, (
+                Ingredient(name=f'ингредиент {i}', measurement_unit='г')
+                for i in range(1000)
+            ))
+            bump_catalog_version('ingredients')
+        ingredient_ids = list(Ingredient.objects.order_by('pk').values_list(
+            'pk', flat=True))
+        # Популярность ингредиента не зависит от его места в таблице.
+        self.rnd.shuffle(ingredient_ids)
+        return ingredient_ids
+
+    def make_images(self, count):
+        images = []
+        for _ in range(count):
+            buffer = BytesIO()
+            color = tuple(self.rnd.randrange(256) for _ in range(3))
+            Image.new('RGB', (600, 400), color).save(buffer, 'JPEG')
+            images.append(recipe_image_storage.save(
+                'recipes/seed.jpg', ContentFile(buffer.getvalue())
+            ))
+        return images
+
+    def create_users(self, count, prefix, password):
+        password = make_password(password)
+        after = last_pk(CustomUser)
+        self.insert('Пользователи', CustomUser, (
+            CustomUser(
+                username=f'{prefix}{i}', email=f'{prefix}{i}@example.com',
+                first_name=self.rnd.choice(FIRST_NAMES),
+                last_name=self.rnd.choice(LAST_NAMES), password=password
+            ) for i in range(count)
+        ))
+        return pks_after(CustomUser, after)
+
+    def create_recipes(self, count, user_ids, images):
+        if not user_ids:
+            return []
+        authors = user_ids[:]
+        self.rnd.shuffle(authors)
+        weights = zipf_weights(len(authors), 1.1)
+        after = last_pk(Recipe)
+        self.insert('Рецепты', Recipe, (
+            Recipe(
+                author_id=self.rnd.choices(authors, cum_weights=weights)[0],
+                name=f'{self.rnd.choice(DISHES)} №{i}',
+                text='Описание рецепта',
+                image=images[i % len(images)] if images else '',
+                cooking_time=min(int(self.rnd.lognormvariate(3.3, 0.6)) + 1,
+                                 600)
+            ) for i in range(count)
+        ))
+        for index, image in enumerate(images):
+            change_image_references(
+                image, len(range(index, count, len(images)))
+            )
+        return pks_after(Recipe, after)
+
+    def create_recipe_relations(self, recipe_ids, tag_ids, ingredient_ids,
+                                average):
+        tag_weights = zipf_weights(len(tag_ids), 0.5)
+        self.insert('Теги рецептов', Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in weighted_sample(
+                self.rnd, tag_ids, tag_weights, self.rnd.randint(1, 2)
+            )
+        ))
+        weights = zipf_weights(len(ingredient_ids))
+        self.insert('Ингредиенты рецептов', IngredientInRecipe, (
+            IngredientInRecipe(
+                recipe_id=recipe_id, ingredient_id=ingredient_id,
+                amount=self.rnd.choice((1, 2, 5, 10, 50, 100, 200, 500))
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in weighted_sample(
+                self.rnd, ingredient_ids, weights,
+                self.rnd.randint(max(average // 2, 1), average * 3 // 2)
+            )
+        ))
+
+    def create_user_relations(self, user_ids, recipe_ids, options):
+        authors = list(Recipe.objects.filter(pk__in=recipe_ids).values_list(
+            'author_id', flat=True).distinct().order_by('author_id'))
+        self.rnd.shuffle(authors)
+        recipes = recipe_ids[:]
+        self.rnd.shuffle(recipes)
+        author_weights = zipf_weights(len(authors))
+        recipe_weights = zipf_weights(len(recipes))
+
+        def around(average):
+            return self.rnd.randint(0, average * 2)
+
+        self.insert('Подписки', Follow, (
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id in user_ids
+            for author_id in weighted_sample(
+                self.rnd, authors, author_weights, around(options['follows'])
+            ) if author_id != user_id
+        ))
+        for label, model, key in (
+            ('Избранное', Favorite, 'favorites'),
+            ('Списки покупок', ShoppingList, 'cart'),
+        ):
+            self.insert(label, model, (
+                model(user_id=user_id, recipe_id=recipe_id)
+                for user_id in user_ids
+                for recipe_id in weighted_sample(
+                    self.rnd, recipes, recipe_weights, around(options[key])
+                )
+            ))
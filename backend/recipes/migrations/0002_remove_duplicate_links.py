@@ -0,0 +1,52 @@
+from django.db import migrations
+from django.db.models import Count, Min, Sum
+
+# Модель -> поле объекта связи. Перед добавлением уникальных ограничений
+# от каждой пары (user, объект) остаётся самая ранняя строка.
+LINKS = (
+    ('recipes', 'Favorite', 'recipe'),
+    ('recipes', 'ShoppingList', 'recipe'),
+    ('users', 'Follow', 'author'),
+)
+
+
+def remove_duplicate_links(apps, schema_editor):
+    for app_label, model_name, field in LINKS:
+        model = apps.get_model(app_label, model_name)
+        duplicates = model.objects.values('user', field).annotate(
+            first=Min('id'), total=Count('id')).filter(total__gt=1)
+        for row in duplicates:
+            model.objects.filter(
+                user=row['user'], **{field: row[field]}
+            ).exclude(id=row['first']).delete()
+
+
+def merge_duplicate_ingredients(apps, schema_editor):
+    # Повторы ингредиента в рецепте сливаются в одну строку с суммой.
+    model = apps.get_model('recipes', 'IngredientInRecipe')
+    duplicates = model.objects.values('recipe', 'ingredient').annotate(
+        first=Min('id'), total=Count('id'), amount_sum=Sum('amount')
+    ).filter(total__gt=1)
+    for row in duplicates:
+        rows = model.objects.filter(
+            recipe=row['recipe'], ingredient=row['ingredient']
+        )
+        rows.exclude(id=row['first']).delete()
+        rows.update(amount=row['amount_sum'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0001_initial'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_links, migrations.RunPython.noop
+        ),
+        migrations.RunPython(
+            merge_duplicate_ingredients, migrations.RunPython.noop
+        ),
+    ]
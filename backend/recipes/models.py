@@ -6,6 +6,11 @@ from users.models import CustomUser
 
 from backend.settings import MIN_COOKING_TIME, MIN_INGREDIENT_AMOUNT
 
+from .storage import recipe_image_storage
+
+# Маска тэгов рецепта хранится в знаковом BigIntegerField.
+MAX_TAGS = 63
+
 
 class Tag(models.Model):
     name = models.CharField(
@@ -16,11 +21,28 @@ class Tag(models.Model):
     slug = models.SlugField(
         max_length=50, unique=True, verbose_name='Slug тэга'
     )
+    bit = models.PositiveSmallIntegerField(
+        unique=True, null=True, editable=False,
+        verbose_name='Бит в маске тэгов')
 
     class Meta:
         verbose_name = 'Тэг'
         verbose_name_plural = 'Тэги'
 
+    def save(self, *args, **kwargs):
+        if self.bit is None:
+            self.bit = self.free_bit()
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def free_bit():
+        used = set(Tag.objects.exclude(bit=None).values_list(
+            'bit', flat=True))
+        for bit in range(MAX_TAGS):
+            if bit not in used:
+                return bit
+        raise ValueError(f'Тэгов не может быть больше {MAX_TAGS}')
+
     def __str__(self):
         return self.name
 
@@ -62,7 +84,11 @@ class Recipe(models.Model):
         related_name='recipes', verbose_name='Автор рецепта')
     name = models.CharField(max_length=50, verbose_name='Название рецепта')
     image = models.ImageField(
-        verbose_name="Фото блюда", upload_to='recipes')
+        verbose_name="Фото блюда", upload_to='recipes',
+        storage=recipe_image_storage)
+    image_variants_for = models.CharField(
+        max_length=100, blank=True, editable=False,
+        verbose_name='Фото, для которого готовы превью')
     text = models.TextField(max_length=1000, verbose_name='Описание рецепта')
     ingredients = models.ManyToManyField(
         Ingredient,
@@ -73,6 +99,13 @@ class Recipe(models.Model):
         verbose_name='Тэги рецепта')
     pub_date = models.DateTimeField(
         auto_now_add=True, verbose_name='Дата публикации')
+    tags_mask = models.BigIntegerField(
+        default=0, editable=False, db_index=True,
+        verbose_name='Маска тэгов')
+    favorites_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='В избранном')
+    in_carts_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='В списках покупок')
     cooking_time = models.PositiveSmallIntegerField(
         verbose_name='Время приготовления',
         help_text='Укажите время приготовления',
@@ -89,10 +122,31 @@ class Recipe(models.Model):
         ordering = ['-pub_date']
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='recipe_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='recipe_author_pub_date_idx'
+            ),
+        ]
+
+    # Имя фото, сохранённого в базе: по нему сигналы считают ссылки на
+    # файл. У нового рецепта его нет, даже если фото уже выбрано.
+    loaded_image = None
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        recipe = super().from_db(db, field_names, values)
+        # Отложенное поле не попадает в __dict__, обращаться к нему нельзя.
+        image = recipe.__dict__.get('image')
+        recipe.loaded_image = getattr(image, 'name', image)
+        return recipe
+
 
 class IngredientInRecipe(models.Model):
     ingredient = models.ForeignKey(
@@ -122,11 +176,54 @@ class IngredientInRecipe(models.Model):
     class Meta:
         verbose_name = 'Количество ингредиента в рецепте'
         verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'ingredient'),
+                name='unique_ingredient_in_recipe'
+            ),
+        ]
+        indexes = [
+            # Покрывающий индекс для суммирования списка покупок.
+            models.Index(
+                fields=['recipe', 'ingredient', 'amount'],
+                name='ingredient_in_recipe_cart_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'{self.ingredient} in {self.recipe}'
 
 
+class SearchTerm(models.Model):
+    """
+    Обратный индекс для поиска рецептов.
+    """
+    term = models.CharField(max_length=50, verbose_name='Основа слова')
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE,
+        related_name='search_terms', verbose_name='Рецепт')
+    score = models.PositiveSmallIntegerField(verbose_name='Вес')
+
+    class Meta:
+        verbose_name = 'Слово поискового индекса'
+        verbose_name_plural = 'Поисковый индекс'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('term', 'recipe'), name='unique_search_term'
+            ),
+        ]
+        indexes = [
+            # Поиск по началу слова через LIKE в PostgreSQL.
+            models.Index(
+                fields=['term'], name='search_term_prefix_idx',
+                opclasses=['varchar_pattern_ops']
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.term} in {self.recipe_id}'
+
+
 class ShoppingList(models.Model):
     user = models.ForeignKey(
         CustomUser, on_delete=models.CASCADE,
@@ -144,6 +241,38 @@ class ShoppingList(models.Model):
     class Meta:
         verbose_name = 'Покупка'
         verbose_name_plural = 'Покупки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_shopping_list'
+            ),
+        ]
+
+
+class CartTotal(models.Model):
+    """
+    Сумма ингредиента по всем рецептам в списке покупок пользователя.
+    """
+    user = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE,
+        related_name='cart_totals', verbose_name='Пользователь')
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE,
+        related_name='cart_totals', verbose_name='Ингредиент')
+    amount = models.BigIntegerField(default=0, verbose_name='Количество')
+    recipes = models.IntegerField(
+        default=0, verbose_name='Рецептов с ингредиентом')
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'), name='unique_cart_total'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.ingredient} {self.amount}'
 
 
 class Favorite(models.Model):
@@ -163,3 +292,24 @@ class Favorite(models.Model):
     class Meta:
         verbose_name = 'Избранное'
         verbose_name_plural = 'Избранное'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_favorite'
+            ),
+        ]
+
+
+class ImageBlob(models.Model):
+    name = models.CharField(
+        max_length=100, unique=True, verbose_name='Файл')
+    references = models.IntegerField(
+        default=0, verbose_name='Количество ссылок')
+    updated = models.DateTimeField(
+        auto_now=True, verbose_name='Дата изменения')
+
+    class Meta:
+        verbose_name = 'Файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+
+    def __str__(self):
+        return f'{self.name} ({self.references})'
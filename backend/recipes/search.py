@@ -0,0 +1,139 @@
+import re
+from collections import Counter, defaultdict
+
+from django.db import connections
+from django.db.models import IntegerField, OuterRef, Q, Subquery, Sum
+
+from .models import IngredientInRecipe, Recipe, SearchTerm
+
+# Вес слова из названия, ингредиентов и описания в обратном индексе.
+WEIGHTS = {'name': 4, 'ingredients': 2, 'text': 1}
+# Однобуквенные слова - в основном предлоги, числа оставляем.
+WORD = re.compile(r'\d+|\w{2,}')
+# Окончания, которые отрезаются от слова; длинные проверяются раньше.
+ENDINGS = sorted((
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими',
+    'ией', 'ях', 'ах', 'ов', 'ев', 'ей', 'ий', 'ый', 'ой', 'ая', 'яя',
+    'ое', 'ее', 'ые', 'ие', 'ую', 'юю', 'ом', 'ем', 'ам', 'ям', 'ию',
+    'ия', 'а', 'я', 'о', 'е', 'ы', 'и', 'у', 'ю', 'ь', 'й',
+), key=len, reverse=True)
+MIN_STEM = 3
+# Больше любого символа: term < prefix + LAST_CHAR значит
+# "начинается с prefix" и при этом использует индекс. В PostgreSQL
+# сравнение строк зависит от локали, там поиск по LIKE и индексу
+# varchar_pattern_ops.
+LAST_CHAR = '\U0010ffff'
+BATCH_SIZE = 500
+
+
+def is_postgresql(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def stem(word):
+    """
+    Грубая основа русского слова: без одного окончания и мягкого знака,
+    который есть не во всех формах (морковь - морковью).
+    """
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            word = word[:-len(ending)]
+            break
+    if word.endswith('ь') and len(word) > MIN_STEM:
+        word = word[:-1]
+    return word
+
+
+def shorter_stems(term):
+    """
+    Основы короче term на одну-две буквы: окончание запроса могло
+    отрезаться не целиком (лук - луковый).
+    """
+    return [
+        term[:length]
+        for length in range(max(MIN_STEM, len(term) - 2), len(term))
+    ]
+
+
+def terms(value):
+    value = value.lower().replace('ё', 'е')
+    return [stem(word)[:50] for word in WORD.findall(value)]
+
+
+def build_terms(recipe_ids):
+    """
+    Строки обратного индекса для рецептов recipe_ids.
+    """
+    scores = defaultdict(Counter)
+    for recipe_id, name, text in Recipe.objects.filter(
+            pk__in=recipe_ids).values_list('id', 'name', 'text'):
+        for term in terms(name):
+            scores[recipe_id][term] += WEIGHTS['name']
+        for term in terms(text):
+            scores[recipe_id][term] += WEIGHTS['text']
+    for recipe_id, name in IngredientInRecipe.objects.filter(
+            recipe_id__in=recipe_ids).values_list(
+            'recipe_id', 'ingredient__name'):
+        for term in terms(name):
+            scores[recipe_id][term] += WEIGHTS['ingredients']
+    return [
+        SearchTerm(recipe_id=recipe_id, term=term, score=min(score, 32767))
+        for recipe_id, counter in scores.items()
+        for term, score in counter.items()
+    ]
+
+
+def update_search_index(recipe_ids):
+    """
+    Обновляет поисковый индекс рецептов после изменения названия,
+    описания или ингредиентов.
+    """
+    recipe_ids = list(recipe_ids)
+    for start in range(0, len(recipe_ids), BATCH_SIZE):
+        batch = recipe_ids[start:start + BATCH_SIZE]
+        SearchTerm.objects.filter(recipe_id__in=batch).delete()
+        SearchTerm.objects.bulk_create(build_terms(batch))
+
+
+def rebuild_search_index():
+    """
+    Перестраивает индекс всех рецептов, возвращает их количество.
+    """
+    SearchTerm.objects.all().delete()
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    for start in range(0, len(recipe_ids), BATCH_SIZE):
+        SearchTerm.objects.bulk_create(
+            build_terms(recipe_ids[start:start + BATCH_SIZE])
+        )
+    return len(recipe_ids)
+
+
+def starts_with(prefix, using):
+    if is_postgresql(using):
+        return Q(term__startswith=prefix)
+    return Q(term__gte=prefix, term__lt=prefix + LAST_CHAR)
+
+
+def search_recipes(queryset, value):
+    """
+    Рецепты, в которых есть все слова запроса, от самых релевантных.
+    """
+    prefixes = set(terms(value))
+    if not prefixes:
+        return queryset.none()
+    matched = Q()
+    for prefix in prefixes:
+        # Слово индекса начинается с основы запроса или само короче её.
+        condition = starts_with(prefix, queryset.db) | Q(
+            term__in=shorter_stems(prefix)
+        )
+        queryset = queryset.filter(pk__in=SearchTerm.objects.filter(
+            condition).values('recipe_id'))
+        matched |= condition
+    rank = Subquery(
+        SearchTerm.objects.filter(
+            matched, recipe=OuterRef('pk')).order_by().values(
+            'recipe').annotate(total=Sum('score')).values('total'),
+        output_field=IntegerField()
+    )
+    return queryset.annotate(rank=rank).order_by('-rank', '-pub_date', '-id')
@@ -0,0 +1,128 @@
+from django.db.models import F
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from django.utils import timezone
+from users.models import CustomUser, Follow
+
+from .cart_totals import change_cart_totals
+from .counters import change_counter
+from .models import Favorite, ImageBlob, Ingredient, Recipe, ShoppingList, Tag
+from .search import update_search_index
+from .tag_masks import update_tags_masks
+
+
+@receiver(post_save, sender=Favorite)
+def favorite_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def favorite_deleted(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'favorites_count', -1)
+
+
+@receiver(post_save, sender=ShoppingList)
+def shopping_list_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(Recipe, instance.recipe_id, 'in_carts_count', 1)
+        change_cart_totals(instance.user_id, [instance.recipe_id], 1)
+
+
+@receiver(post_delete, sender=ShoppingList)
+def shopping_list_deleted(sender, instance, **kwargs):
+    change_counter(Recipe, instance.recipe_id, 'in_carts_count', -1)
+
+
+@receiver(pre_delete, sender=ShoppingList)
+def shopping_list_deleting(sender, instance, **kwargs):
+    # До удаления: при удалении рецепта его ингредиенты ещё на месте.
+    change_cart_totals(instance.user_id, [instance.recipe_id], -1)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(CustomUser, instance.author_id, 'recipes_count', 1)
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    change_counter(CustomUser, instance.author_id, 'recipes_count', -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(CustomUser, instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    change_counter(CustomUser, instance.author_id, 'followers_count', -1)
+
+
+def change_image_references(name, delta):
+    if not name:
+        return
+    ImageBlob.objects.get_or_create(name=name)
+    ImageBlob.objects.filter(name=name).update(
+        references=F('references') + delta, updated=timezone.now()
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    image = instance.image.name
+    if image != instance.loaded_image:
+        change_image_references(image, 1)
+        change_image_references(instance.loaded_image, -1)
+        instance.loaded_image = image
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_image_deleted(sender, instance, **kwargs):
+    change_image_references(instance.image.name, -1)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance.cleared_recipe_ids = list(
+            instance.recipes.values_list('pk', flat=True)
+        )
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        update_tags_masks([instance.pk])
+    elif action == 'post_clear':
+        update_tags_masks(instance.cleared_recipe_ids)
+    else:
+        update_tags_masks(pk_set)
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    if instance.bit is not None:
+        Recipe.objects.filter(tags_mask__gt=0).update(
+            tags_mask=F('tags_mask').bitand(~(1 << instance.bit))
+        )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_text_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'name', 'text'} & set(
+            update_fields):
+        return
+    update_search_index([instance.pk])
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_renamed(sender, instance, created, **kwargs):
+    if not created:
+        update_search_index(
+            instance.recipes.values_list('pk', flat=True)
+        )
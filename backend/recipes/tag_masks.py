@@ -0,0 +1,45 @@
+from django.db.models import (BigIntegerField, ExpressionWrapper, F, OuterRef,
+                              Subquery, Sum, Value)
+from django.db.models.functions import Cast, Coalesce
+
+from .models import Recipe
+
+
+def tags_mask(bits):
+    """
+    Маска из номеров битов тэгов. Тэги без бита (до recount_counters)
+    пропускаются.
+    """
+    return sum(1 << bit for bit in set(bits) if bit is not None)
+
+
+def matching_masks(selected, bits):
+    """
+    Все маски из битов bits, пересекающиеся с маской selected.
+    """
+    masks = [0]
+    for bit in sorted(set(bits)):
+        masks += [mask | 1 << bit for mask in masks]
+    return [mask for mask in masks if mask & selected]
+
+
+def tags_mask_expression():
+    """
+    Маска рецепта OuterRef('pk'), посчитанная по его тэгам.
+    """
+    bit = ExpressionWrapper(
+        Cast(Value(1), BigIntegerField()).bitleftshift(F('tag__bit')),
+        output_field=BigIntegerField()
+    )
+    return Coalesce(Subquery(
+        Recipe.tags.through.objects.filter(
+            recipe=OuterRef('pk')).order_by().values('recipe').annotate(
+            mask=Sum(bit)).values('mask'),
+        output_field=BigIntegerField()
+    ), 0)
+
+
+def update_tags_masks(recipe_ids):
+    return Recipe.objects.filter(pk__in=recipe_ids).update(
+        tags_mask=tags_mask_expression()
+    )
@@ -0,0 +1,53 @@
+import pytest
+from django.core.management import call_command
+from recipes.models import Favorite, Recipe, ShoppingList
+from users.models import CustomUser, Follow
+
+
+@pytest.fixture
+def users():
+    return [
+        CustomUser.objects.create_user(
+            email=f'user{i}@foodgram.ru', username=f'user{i}',
+            first_name='Имя', last_name='Фамилия', password='pass12345'
+        ) for i in range(2)
+    ]
+
+
+@pytest.fixture
+def recipe(users):
+    return Recipe.objects.create(
+        author=users[0], name='Рецепт', text='Описание',
+        image='recipes/test.jpg', cooking_time=10
+    )
+
+
+@pytest.mark.django_db
+def test_counters_follow_writes(users, recipe):
+    reader = users[1]
+    favorite = Favorite.objects.create(user=reader, recipe=recipe)
+    ShoppingList.objects.create(user=reader, recipe=recipe)
+    follow = Follow.objects.create(user=reader, author=users[0])
+    recipe.refresh_from_db()
+    users[0].refresh_from_db()
+    assert (recipe.favorites_count, recipe.in_carts_count) == (1, 1)
+    assert (users[0].recipes_count, users[0].followers_count) == (1, 1)
+
+    favorite.delete()
+    follow.delete()
+    recipe.refresh_from_db()
+    users[0].refresh_from_db()
+    assert recipe.favorites_count == 0
+    assert users[0].followers_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_counters(users, recipe):
+    Favorite.objects.bulk_create([Favorite(user=users[1], recipe=recipe)])
+    Recipe.objects.update(in_carts_count=7)
+    CustomUser.objects.update(recipes_count=3)
+    call_command('recount_counters')
+    recipe.refresh_from_db()
+    assert (recipe.favorites_count, recipe.in_carts_count) == (1, 0)
+    assert list(CustomUser.objects.order_by('id').values_list(
+        'recipes_count', flat=True)) == [1, 0]
@@ -0,0 +1,62 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+from recipes.images import generate_variants, get_srcset, variant_name
+from recipes.models import Recipe
+from users.models import CustomUser
+
+
+def make_image(color='orange'):
+    buffer = BytesIO()
+    Image.new('RGB', (1000, 500), color).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue())
+
+
+@pytest.fixture
+def recipe(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.RECIPE_IMAGE_WIDTHS = (300, 600)
+    author = CustomUser.objects.create_user(
+        email='author@foodgram.ru', username='author',
+        first_name='Имя', last_name='Фамилия', password='pass12345'
+    )
+    recipe = Recipe(
+        author=author, name='Рецепт', text='Описание', cooking_time=10
+    )
+    recipe.image.save('photo.png', make_image())
+    return recipe
+
+
+@pytest.mark.django_db
+def test_srcset_falls_back_to_original(recipe):
+    url = f'/media/{recipe.image.name}'
+    assert get_srcset(recipe) == {'jpeg': url, 'webp': url}
+
+
+@pytest.mark.django_db
+def test_generate_variants(recipe):
+    generate_variants(recipe.id, recipe.image.name)
+    recipe.refresh_from_db()
+    with default_storage.open(
+            variant_name(recipe.image.name, 300, 'webp')) as file:
+        image = Image.open(file)
+        assert (image.format, image.size) == ('WEBP', (300, 150))
+    directory, filename = recipe.image.name.rsplit('/', 1)
+    stem = filename.split('.')[0]
+    prefix = f'/media/{directory}/variants/{stem}'
+    assert get_srcset(recipe) == {
+        'jpeg': f'{prefix}_300.jpg 300w, {prefix}_600.jpg 600w',
+        'webp': f'{prefix}_300.webp 300w, {prefix}_600.webp 600w',
+    }
+
+
+@pytest.mark.django_db
+def test_variants_ignored_for_replaced_image(recipe):
+    old_name = recipe.image.name
+    recipe.image.save('other.png', make_image('green'))
+    generate_variants(recipe.id, old_name)
+    recipe.refresh_from_db()
+    assert recipe.image_variants_for == ''
@@ -0,0 +1,55 @@
+import json
+
+import pytest
+from django.core.management import call_command
+from recipes.models import Ingredient
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    path = tmp_path / 'ingredients.csv'
+    path.write_text(
+        'соль,г\nсахар,г\nсоль,г\nбитая строка\nмолоко,мл\n',
+        encoding='utf-8'
+    )
+    return str(path)
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    path = tmp_path / 'ingredients.json'
+    path.write_text(json.dumps([
+        {'name': 'соль', 'measurement_unit': 'г'},
+        {'name': 'мёд', 'measurement_unit': 'ст. л.'},
+    ], ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.django_db
+def test_import_csv(csv_file, capsys):
+    call_command('import_csv', csv_file, batch_size=2)
+    assert set(Ingredient.objects.values_list('name', flat=True)) == {
+        'соль', 'сахар', 'молоко'
+    }
+    assert 'Добавлено: 3, пропущено: 2' in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_import_is_idempotent(csv_file, json_file, capsys):
+    call_command('import_csv', csv_file)
+    call_command('import_csv', csv_file, json_file)
+    assert Ingredient.objects.count() == 4
+    assert 'Добавлено: 1, пропущено: 6' in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_import_json_streaming(tmp_path, monkeypatch):
+    from recipes.management.commands import import_csv
+    monkeypatch.setattr(import_csv, 'CHUNK_SIZE', 7)
+    path = tmp_path / 'ingredients.data'
+    path.write_text(json.dumps([
+        {'name': f'ингредиент {i}', 'measurement_unit': 'г'}
+        for i in range(50)
+    ], ensure_ascii=False, indent=2), encoding='utf-8')
+    call_command('import_csv', str(path), format='json')
+    assert Ingredient.objects.count() == 50
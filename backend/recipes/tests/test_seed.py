@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+from recipes.models import (Favorite, ImageBlob, IngredientInRecipe, Recipe,
+                            ShoppingList, Tag)
+from users.models import CustomUser, Follow
+
+
+def seed(*args):
+    call_command(
+        'seed', '--users', '20', '--recipes', '50', *args, stdout=StringIO()
+    )
+
+
+def snapshot():
+    return {
+        'recipes': list(Recipe.objects.order_by('pk').values_list(
+            'author__username', 'name', 'cooking_time')),
+        'ingredients': list(IngredientInRecipe.objects.order_by(
+            'pk').values_list('recipe__name', 'ingredient__name', 'amount')),
+        'follows': list(Follow.objects.order_by('pk').values_list(
+            'user__username', 'author__username')),
+    }
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.mark.django_db
+def test_seed_creates_dataset():
+    seed('--images', '2')
+    assert CustomUser.objects.count() == 20
+    assert Recipe.objects.count() == 50
+    assert Tag.objects.count() == 3
+    assert not Recipe.objects.annotate(
+        total=Count('recipes_ingredients_list')).filter(total=0).exists()
+    assert not Follow.objects.filter(user=F('author')).exists()
+    assert not Recipe.objects.filter(tags_mask=0).exists()
+    assert sorted(ImageBlob.objects.values_list(
+        'references', flat=True)) == [25, 25]
+    recipe = Recipe.objects.order_by('?').first()
+    assert recipe.favorites_count == Favorite.objects.filter(
+        recipe=recipe).count()
+    assert recipe.in_carts_count == ShoppingList.objects.filter(
+        recipe=recipe).count()
+
+
+@pytest.mark.django_db
+def test_seed_is_deterministic():
+    seed('--seed', '7')
+    first = snapshot()
+    for model in (Follow, Favorite, ShoppingList, Recipe, CustomUser):
+        model.objects.all().delete()
+    seed('--seed', '7')
+    assert snapshot() == first
+
+
+@pytest.mark.django_db
+def test_seed_refuses_existing_prefix():
+    seed('--images', '0')
+    with pytest.raises(CommandError):
+        seed()
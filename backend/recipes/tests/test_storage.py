@@ -0,0 +1,83 @@
+from io import StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from recipes.models import ImageBlob, Recipe
+from recipes.storage import recipe_image_storage
+from users.models import CustomUser
+
+
+@pytest.fixture
+def author(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return CustomUser.objects.create_user(
+        email='author@foodgram.ru', username='author',
+        first_name='Имя', last_name='Фамилия', password='pass12345'
+    )
+
+
+def make_recipe(author, content, filename='photo.png'):
+    recipe = Recipe(
+        author=author, name='Рецепт', text='Описание', cooking_time=10
+    )
+    recipe.image.save(filename, ContentFile(content))
+    return recipe
+
+
+def references(name):
+    return ImageBlob.objects.get(name=name).references
+
+
+@pytest.mark.django_db
+def test_same_content_is_stored_once(author, tmp_path):
+    first = make_recipe(author, b'photo', 'first.png')
+    second = make_recipe(author, b'photo', 'second.PNG')
+    assert first.image.name == second.image.name
+    assert first.image.name.startswith('recipes/')
+    assert first.image.name.endswith('.png')
+    assert len(list((tmp_path / 'recipes').glob('*/*.png'))) == 1
+    assert references(first.image.name) == 2
+
+
+@pytest.mark.django_db
+def test_references_follow_image_changes(author):
+    recipe = make_recipe(author, b'old')
+    old_name = recipe.image.name
+    recipe.image.save('new.png', ContentFile(b'new'))
+    assert references(old_name) == 0
+    assert references(recipe.image.name) == 1
+    recipe.delete()
+    assert references(recipe.image.name) == 0
+
+
+@pytest.mark.django_db
+def test_collect_images_removes_orphans(author):
+    kept = make_recipe(author, b'kept')
+    orphan = make_recipe(author, b'orphan')
+    orphan_name = orphan.image.name
+    orphan.delete()
+    out = StringIO()
+    call_command('collect_images', '--min-age', '0', stdout=out)
+    assert not recipe_image_storage.exists(orphan_name)
+    assert recipe_image_storage.exists(kept.image.name)
+    assert not ImageBlob.objects.filter(name=orphan_name).exists()
+
+
+@pytest.mark.django_db
+def test_collect_images_recount(author):
+    recipe = make_recipe(author, b'photo')
+    ImageBlob.objects.update(references=0)
+    call_command('collect_images', '--recount', '--min-age', '0',
+                 stdout=StringIO())
+    assert recipe_image_storage.exists(recipe.image.name)
+    assert references(recipe.image.name) == 1
+
+
+@pytest.mark.django_db
+def test_recipe_images_are_served_as_immutable(author, client):
+    recipe = make_recipe(author, b'photo')
+    response = client.get(f'/media/{recipe.image.name}')
+    assert response.status_code == 200
+    assert 'immutable' in response['Cache-Control']
+    assert 'max-age=31536000' in response['Cache-Control']
@@ -0,0 +1,17 @@
+import os
+
+from django.conf import settings
+from django.views.decorators.cache import cache_control
+from django.views.static import serve
+
+# Имя файла фото - хеш содержимого, поэтому по одному адресу всегда
+# лежит одно и то же изображение.
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+@cache_control(public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+def recipe_image(request, path):
+    return serve(
+        request, path,
+        document_root=os.path.join(settings.MEDIA_ROOT, 'recipes')
+    )
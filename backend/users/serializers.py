@@ -1,5 +1,5 @@
+from api.membership import is_member
 from rest_framework import serializers
-from users.models import Follow
 
 from .models import CustomUser
 
@@ -13,7 +13,4 @@ class UserSerializer(serializers.ModelSerializer):
                   'first_name', 'last_name', 'is_subscribed')
 
     def get_is_subscribed(self, obj):
-        request = self.context.get('request')
-        if request is None or request.user.is_anonymous:
-            return False
-        return Follow.objects.filter(user=request.user, author=obj).exists()
+        return is_member(self.context, 'follows', obj.id)